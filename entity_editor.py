@@ -10,13 +10,21 @@
 # - Auto IDs (IT###### / NP######)
 # - Clean Tk UI, raw JSON toggle
 
-import json, os, re, time, random, sys
-from dataclasses import dataclass
+import functools, gzip, hashlib, heapq, json, math, os, re, shutil, tempfile, time, random, sys, weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import Counter
+from dataclasses import dataclass, field
 from typing import Any, List, Optional, Sequence, Dict, Tuple
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
+# Optional C-accelerated JSON; the stdlib json module is used when missing
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # ---------- Constants ----------
 
 TYPE_OPTIONS = {
@@ -30,6 +38,9 @@ TYPE_OPTIONS = {
     "misc":["misc"]
 }
 
+# Union of every category's types, for forms with no category context
+_ALL_TYPES = tuple(sorted({t for arr in TYPE_OPTIONS.values() for t in arr}))
+
 RARITY_OPTIONS = ["common","uncommon","rare","epic","legendary","relic"]
 
 BASE_DIR   = os.path.abspath(os.path.dirname(__file__))
@@ -39,6 +50,17 @@ NPCS_DIR   = os.path.join(BASE_DIR, "data", "npcs")
 RE_ID_ITEM = re.compile(r"^IT\d{6}$")
 RE_ID_NPC  = re.compile(r"^(?:NP|NPC)\d{6}$")
 
+# Hoisted patterns for legacy 8-digit ID normalization
+_RE_IT8    = re.compile(r"IT(\d{8})$")
+_RE_NPX8   = re.compile(r"^(NP|NPC)(\d{8})$")
+_RE_NPX    = re.compile(r"^(NP|NPC)")
+_RE_ID8    = re.compile(r"^([A-Z]{2,3})(\d{8})$")
+
+def _normalize_id8(s: str) -> str:
+    """Any 2-3 letter prefix + legacy 8 digits -> prefix + last 6 digits."""
+    m8 = _RE_ID8.match(s)
+    return m8.group(1) + m8.group(2)[-6:] if m8 else s
+
 BONUS_KEYS = [
     "PHY","TEC","ARC","VIT","KNO","INS","SOC","FTH",
     "hp","mp","initiative","speed",
@@ -129,27 +151,48 @@ class Dataset:
     root: Any
     list_key: Optional[str]
     data: List[Any]
+    # Per-file filter values / search rows, computed on first view; set back
+    # to None whenever data changes
+    filters: Optional[tuple] = field(default=None, repr=False, compare=False)
 
-def discover_json_files(folder: str) -> List[str]:
+def discover_json_files(folder: str) -> List[Tuple[str, os.DirEntry]]:
+    # DirEntry keeps the stat result from the directory scan, so callers can
+    # reuse entry.path / entry.stat() without extra syscalls per file.
     if not os.path.isdir(folder):
         return []
-    return sorted([f for f in os.listdir(folder) if f.lower().endswith(".json")])
-
-def load_dataset(path: str, preferred_keys: Sequence[str] = (), *, allow_first_list=True, fallback_key: Optional[str]=None):
-    if not os.path.exists(path):
-        return None
-    if os.path.getsize(path) == 0:
+    with os.scandir(folder) as it:
+        found = [(e.name, e) for e in it if e.name.lower().endswith(".json") and e.is_file()]
+    found.sort(key=lambda pair: pair[0])
+    return found
+
+def _parse_json_file(path: str) -> Any:
+    # Bytes straight to the parser, no separate text-decode pass; stdlib json
+    # detects the encoding (BOM included) itself
+    with open(path, "rb") as f:
+        raw = f.read()
+    if orjson is not None:
+        if raw.startswith(b"\xef\xbb\xbf"):
+            raw = raw[3:]
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def read_dataset(path: str, preferred_keys: Sequence[str] = (), *, allow_first_list=True, fallback_key: Optional[str]=None, st: Optional[os.stat_result]=None):
+    """-> (root, list, list_key) or None. No UI: raises json.JSONDecodeError,
+    so it can run on a worker thread."""
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+    if st.st_size == 0:
         if fallback_key:
             root = {fallback_key: []}
             return root, root[fallback_key], fallback_key
         empty: List[Any] = []
         return empty, empty, None
-    try:
-        with open(path, "r", encoding="utf-8-sig") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as exc:
-        messagebox.showerror("Invalid JSON", f"{os.path.basename(path)} could not be parsed:\n{exc}")
-        return None
+    # Parsed fresh each time: callers edit the returned lists in place, and a
+    # parse is cheaper than deep-copying a cached tree
+    data = _parse_json_file(path)
     if isinstance(data, list):
         return data, data, None
     if isinstance(data, dict):
@@ -163,25 +206,110 @@ def load_dataset(path: str, preferred_keys: Sequence[str] = (), *, allow_first_l
                     return data, val, key
     return None
 
+def load_dataset(path: str, preferred_keys: Sequence[str] = (), **kw):
+    """read_dataset for the Tk thread: parse errors become a message box."""
+    try:
+        return read_dataset(path, preferred_keys, **kw)
+    except json.JSONDecodeError as exc:
+        show_parse_error(path, exc)
+        return None
+
+def show_parse_error(path: str, exc: Exception) -> None:
+    messagebox.showerror("Invalid JSON", f"{os.path.basename(path)} could not be parsed:\n{exc}")
+
+# Compact saves write one entry per line instead of the fully indented layout:
+# roughly half the bytes on disk while keeping diffs per entry readable.
+# Set to False to get the indent=2 layout back.
+COMPACT_SAVE = True
+
+def _loads_json(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _dumps_compact(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _dumps_indented(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+def _dumps_list_lines(lst: List[Any]) -> str:
+    if not lst:
+        return "[]"
+    return "[\n" + ",\n".join(_dumps_compact(x) for x in lst) + "\n]"
+
+def encode_json_payload(payload: Any) -> str:
+    if not COMPACT_SAVE:
+        return _dumps_indented(payload)
+    if isinstance(payload, list):
+        return _dumps_list_lines(payload)
+    if isinstance(payload, dict) and payload:
+        parts = []
+        for k, v in payload.items():
+            body = _dumps_list_lines(v) if isinstance(v, list) else _dumps_compact(v)
+            parts.append(f"{_dumps_compact(str(k))}:{body}")
+        return "{\n" + ",\n".join(parts) + "\n}"
+    return _dumps_compact(payload)
+
+# Digest of the last text written per path, with the file's stat right after the write
+_LAST_SAVED: Dict[str, Tuple[int, int, bytes]] = {}
+
 def save_json_file(path: str, root_obj: Any, list_ref: List[Any], list_key: Optional[str]) -> None:
     payload = root_obj if isinstance(root_obj, dict) else list_ref
     if isinstance(root_obj, dict) and list_key:
         root_obj[list_key] = list_ref
         payload = root_obj
+    text = encode_json_payload(payload)
+    digest = hashlib.blake2b(text.encode("utf-8")).digest()
+    # Nothing changed since our last write and nobody touched the file since:
+    # skip the backup and the rewrite entirely
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    last = _LAST_SAVED.get(path)
+    if st is not None and last is not None and last == (st.st_mtime_ns, st.st_size, digest):
+        return
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    backup_data = None
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as src:
-                backup_data = src.read()
-        except Exception:
-            backup_data = None
-    if backup_data:
+    has_backup = st is not None and st.st_size > 0
+    if has_backup:
         ts = time.strftime("%Y%m%d_%H%M%S")
-        with open(path + f".{ts}.bak", "w", encoding="utf-8") as bf:
-            bf.write(backup_data)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+        # Stream the old file into the backup instead of holding it in memory.
+        # JSON compresses well; level 1 keeps the backup write cheap.
+        try:
+            with open(path, "rb") as src, gzip.open(path + f".{ts}.bak.gz", "wb", compresslevel=1) as bf:
+                shutil.copyfileobj(src, bf, 1 << 20)
+        except OSError:
+            pass
+    # Write to a temp file in the same folder and rename over the target, so a
+    # crash mid-write never leaves a truncated JSON behind. No fsync: the OS
+    # page cache absorbs the write and the UI returns immediately.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # mkstemp creates 0600 files; keep the target's permissions instead
+        try:
+            shutil.copymode(path, tmp)
+        except OSError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        _LAST_SAVED.pop(path, None)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    try:
+        st = os.stat(path)
+        _LAST_SAVED[path] = (st.st_mtime_ns, st.st_size, digest)
+    except OSError:
+        _LAST_SAVED.pop(path, None)
 
 # ---------- IDs & categories ----------
 
@@ -189,70 +317,137 @@ def ensure_item_id(item, existing_ids):
 
     _id = (item.get("id","") or "").strip()
     # normalize legacy 8-digit to 6-digit if present
-    m8 = re.match(r"^IT(\d{8})$", _id)
+    m8 = _RE_IT8.match(_id)
     if m8:
         _id = "IT" + m8.group(1)[-6:]
     if RE_ID_ITEM.match(_id) and _id not in existing_ids:
         return _id
-    base = 1
-    if existing_ids:
-        nums = []
-        for s in existing_ids:
-            if not s: continue
-            m6 = re.match(r"IT(\d{6})$", (s or "").strip())
-            if m6: nums.append(int(m6.group(1)))
-            else:
-                m8 = re.match(r"IT(\d{8})$", (s or "").strip())
-                if m8: nums.append(int(m8.group(1)[-6:]))
-        base = (max(nums) + 1) if nums else 1
+    # single pass, no regex: IT + 6 digits (or legacy 8, keeping the last 6)
+    stripped = (s.strip() for s in existing_ids if s)
+    base = max((int(s[-6:]) for s in stripped
+                if len(s) in (8, 10) and s.startswith("IT") and s[2:].isdecimal()), default=0) + 1
     return f"IT{base:06d}"
 
 def ensure_npc_id(npc, existing_ids):
 
     _id = (npc.get("id","") or "").strip().upper()
     # normalize legacy 8-digit to 6-digit if present
-    m8 = re.match(r"^(NP|NPC)(\d{8})$", _id)
+    m8 = _RE_NPX8.match(_id)
     if m8:
         _id = m8.group(1) + m8.group(2)[-6:]
     if RE_ID_NPC.match(_id) and _id not in existing_ids:
         return _id
     prefix = "NP"
-    nums = []
+    top = 0
     for s in existing_ids:
         if not s: continue
         s = s.strip().upper()
-        m6 = re.match(r"^(NP|NPC)(\d{6})$", s)
-        if m6:
-            nums.append(int(m6.group(2)))
-            if m6.group(1) == "NPC":
-                prefix = "NPC"
+        # NP/NPC + 6 digits, or legacy 8 digits (keep the last 6)
+        n = len(s)
+        if n in (8, 10) and s.startswith("NP") and s[2:].isdecimal():
+            num = int(s[-6:])
+        elif n in (9, 11) and s.startswith("NPC") and s[3:].isdecimal():
+            num = int(s[-6:])
+            prefix = "NPC"
         else:
-            m8 = re.match(r"^(NP|NPC)(\d{8})$", s)
-            if m8:
-                nums.append(int(m8.group(2)[-6:]))
-                if m8.group(1) == "NPC":
-                    prefix = "NPC"
-    next_num = (max(nums) + 1) if nums else 1
+            continue
+        if num > top:
+            top = num
+    next_num = top + 1
     # keep original prefix if user typed one
-    pm = re.match(r"^(NP|NPC)", _id)
+    pm = _RE_NPX.match(_id)
     if pm:
         prefix = pm.group(1)
     return f"{prefix}{next_num:06d}"
 
-def infer_category(item):
-    for k in ("category","slot","type"):
-        v = item.get(k)
-        if isinstance(v, str) and v.strip():
+def count_ids(entries) -> Counter:
+    """id -> number of entries using it; kept up to date by the tabs so
+    ensure_*_id doesn't need a fresh set on every new/dup/save."""
+    return Counter(e["id"] for e in entries if "id" in e)
+
+def uncount_id(counts: Counter, _id) -> None:
+    n = counts.get(_id, 0)
+    if n > 1: counts[_id] = n - 1
+    else: counts.pop(_id, None)
+
+@functools.lru_cache(maxsize=4096)
+def _infer_category_cached(cat: Optional[str], slot: Optional[str], typ: Optional[str]) -> str:
+    for k, v in (("category", cat), ("slot", slot), ("type", typ)):
+        if v and v.strip():
             return f"{k}:{v}"
     return "uncategorized"
 
+def infer_category(item):
+    c, sl, ty = item.get("category"), item.get("slot"), item.get("type")
+    return _infer_category_cached(c if isinstance(c, str) else None,
+                                  sl if isinstance(sl, str) else None,
+                                  ty if isinstance(ty, str) else None)
+
 def get_all_categories(items):
     cats = {infer_category(it) for it in items}
     return ["(all)"] + sorted(cats)
 
+def build_item_rows(items, memo: Optional[Dict[int, tuple]] = None) -> Tuple[List[str], List[Tuple[str, str, str, str, str]]]:
+    """One pass over items -> (category filter values, search rows).
+
+    Each row is (name_lower, id_lower, category, type, listbox line), so
+    filtering on a keystroke is plain string tests against cached values.
+    With a memo (id(item) -> (item, row)) unchanged items reuse their row;
+    the memo is pruned to the items passed in.
+    """
+    cats = set()
+    rows: List[Tuple[str, str, str, str, str]] = []
+    live: Dict[int, tuple] = {}
+    for it in items:
+        hit = memo.get(id(it)) if memo else None
+        if hit is not None and hit[0] is it:
+            row = hit[1]
+        else:
+            # Category/type values repeat across thousands of items: intern them so
+            # rows share one string and the filter's == usually hits the identity check
+            it_cat = sys.intern(infer_category(it))
+            it_type = it.get("type","") or ""
+            if isinstance(it_type, str): it_type = sys.intern(it_type)
+            name = str(it.get("name","") or "")
+            iid  = str(it.get("id","") or "")
+            row = (name.lower(), iid.lower(), it_cat, it_type, f"{iid} — {name} [{it_cat}]")
+        if memo is not None:
+            live[id(it)] = (it, row)
+        cats.add(row[2])
+        rows.append(row)
+    if memo is not None:
+        memo.clear(); memo.update(live)
+    return ["(all)"] + sorted(cats), rows
+
+def scan_items(rows, q: str = "", cat: str = "(all)", itype: str = "(all)",
+               candidates: Optional[Sequence[int]] = None) -> Tuple[List[int], List[str]]:
+    """Filter rows from build_item_rows -> (filtered indices, listbox lines).
+
+    candidates limits the scan to those row indices (e.g. the previous
+    result when the query only grew).
+    """
+    cat = "" if cat == "(all)" else sys.intern(cat)
+    itype = "" if itype == "(all)" else sys.intern(itype)
+    indices: List[int] = []
+    lines: List[str] = []
+    for i in (range(len(rows)) if candidates is None else candidates):
+        name_lc, id_lc, it_cat, it_type, line = rows[i]
+        if q and (q not in name_lc) and (q not in id_lc):
+            continue
+        if cat and it_cat != cat:
+            continue
+        if itype and it_type != itype:
+            continue
+        indices.append(i)
+        lines.append(line)
+    return indices, lines
+
 # ---- Global items index for components
 ALL_ITEMS_ID_TO_LABEL: Dict[str, str] = {}
 ALL_ITEMS_LABEL_TO_ID: Dict[str, str] = {}
+ALL_ITEMS_LABELS_SORTED: Tuple[str, ...] = ()
+# (label, label.lower()) for the same labels, so pickers never re-lowercase them
+ALL_ITEMS_LABELS_LC: Tuple[Tuple[str, str], ...] = ()
 
 def build_item_label(it: dict) -> str:
     iid = str(it.get("id","?")).strip() or "?"
@@ -260,22 +455,39 @@ def build_item_label(it: dict) -> str:
     cat  = infer_category(it)
     return f"{iid} — {name} [{cat}]"
 
-def rebuild_items_index(all_item_lists: List[List[dict]]):
-    global ALL_ITEMS_ID_TO_LABEL, ALL_ITEMS_LABEL_TO_ID
-    id2label = {}
-    for lst in all_item_lists:
-        for it in lst:
-            iid = str(it.get("id","")).strip()
-            if not iid: continue
-            id2label[iid] = build_item_label(it)
+def item_labels(lst: List[dict]) -> Dict[str, str]:
+    """id -> component label for one item list (a later duplicate id wins)."""
+    # infer_category shares its memo with the search rows, so reindexing
+    # doesn't reclassify
+    id2label: Dict[str, str] = {}
+    for it in lst:
+        iid = str(it.get("id","")).strip()
+        if not iid: continue
+        id2label[iid] = build_item_label(it)
+    return id2label
+
+def install_items_index(label_maps) -> None:
+    """Merge per-file item_labels() results (in file order) into the global index."""
+    global ALL_ITEMS_ID_TO_LABEL, ALL_ITEMS_LABEL_TO_ID, ALL_ITEMS_LABELS_SORTED, ALL_ITEMS_LABELS_LC
+    id2label: Dict[str, str] = {}
+    for part in label_maps:
+        id2label.update(part)
+    # inverted after the merge, so a duplicate id's stale label never lingers
+    label2id = {label: iid for iid, label in id2label.items()}
     ALL_ITEMS_ID_TO_LABEL = id2label
-    ALL_ITEMS_LABEL_TO_ID = {label: iid for iid, label in id2label.items()}
+    ALL_ITEMS_LABEL_TO_ID = label2id
+    # sorted once here so every ComponentsField can use it as-is
+    ALL_ITEMS_LABELS_SORTED = tuple(sorted(label2id))
+    ALL_ITEMS_LABELS_LC = tuple((lab, lab.lower()) for lab in ALL_ITEMS_LABELS_SORTED)
+
+def rebuild_items_index(all_item_lists: List[List[dict]]):
+    install_items_index(item_labels(lst) for lst in all_item_lists)
 
 # ---------- Slot inference ----------
 
-def derive_slot(item: dict) -> str:
-    t = str(item.get("type","") or "").strip().lower()
-    cat = str(item.get("category","") or "").strip().lower()
+@functools.lru_cache(maxsize=4096)
+def _derive_slot_cached(t: str, cat: str) -> Optional[str]:
+    # t / cat are already stripped + lowercased; None means "no rule matched"
     def has(*words):
         return any(w in t for w in words)
     if has("head","helm","helmet","circlet","hood","hat","cap","mask"):
@@ -308,10 +520,104 @@ def derive_slot(item: dict) -> str:
         return "consumable"
     if cat in ("materials","material"):
         return "material"
+    return None
+
+def derive_slot(item: dict) -> str:
+    t = str(item.get("type","") or "").strip().lower()
+    cat = str(item.get("category","") or "").strip().lower()
+    slot = _derive_slot_cached(t, cat)
+    if slot is not None:
+        return slot
     return item.get("slot","") or "misc"
 
 # ---------- Composite fields ----------
 
+# Pickers whose selections clear when the user clicks anywhere outside them.
+# One <Button-1> handler per toplevel serves all of them, instead of every
+# picker built by KeyValueForm.set_object adding its own.
+_CLICK_CLEAR_PICKERS: "weakref.WeakSet[tk.Misc]" = weakref.WeakSet()
+
+def _is_descendant(widget, container) -> bool:
+    # Tk pathnames encode the hierarchy (".!frame.!listbox"), so a prefix test
+    # replaces walking .master; works for str widgets (e.g. combobox popdowns) too
+    wp, cp = str(widget), str(container)
+    return wp == cp or wp.startswith(cp + ".")
+
+def _click_clear_pickers(event) -> None:
+    for picker in list(_CLICK_CLEAR_PICKERS):
+        try:
+            if not _is_descendant(event.widget, picker):
+                picker.lb.selection_clear(0, "end")
+                picker.sel.selection_clear(0, "end")
+        except Exception:
+            pass
+
+def _register_click_clear(picker: tk.Misc) -> None:
+    _CLICK_CLEAR_PICKERS.add(picker)
+    top = picker.winfo_toplevel()
+    if not getattr(top, "_click_clear_bound", False):
+        top.bind("<Button-1>", _click_clear_pickers, add="+")
+        top._click_clear_bound = True
+
+def _set_listbox_rows(lb: tk.Listbox, var: tk.StringVar, rows) -> None:
+    """Replace every row of a listvariable-backed Listbox in one Tcl call."""
+    lb.selection_clear(0, "end")
+    var.set(tuple(rows))
+
+def _diff_listbox_rows(lb: tk.Listbox, shown: List[str], rows: List[str]) -> None:
+    """Make lb show rows, deleting/inserting only the span between the common
+    prefix and suffix. shown mirrors lb's current rows and is updated in place."""
+    lb.selection_clear(0, "end")
+    if shown == rows:
+        return
+    n_old, n_new = len(shown), len(rows)
+    lim = min(n_old, n_new)
+    lo = 0
+    while lo < lim and shown[lo] == rows[lo]:
+        lo += 1
+    hi = 0
+    while hi < lim - lo and shown[n_old - 1 - hi] == rows[n_new - 1 - hi]:
+        hi += 1
+    if n_old - hi > lo:
+        lb.delete(lo, n_old - hi - 1)
+    if n_new - hi > lo:
+        lb.insert(lo, *rows[lo:n_new - hi])
+    shown[:] = rows
+
+class ListboxWindow:
+    """Feeds a Listbox its rows a chunk at a time.
+
+    set_rows() only puts the first CHUNK rows into the widget; more are
+    appended when the view scrolls near the end, so a 10k-row filter result
+    doesn't cost 10k Tk rows up front. Row i of the widget is rows[i].
+    """
+    CHUNK = 300
+
+    def __init__(self, lb: tk.Listbox):
+        self.lb = lb
+        self.rows: List[str] = []
+        self.shown: List[str] = []  # what lb holds: a prefix of rows
+        lb.configure(yscrollcommand=self._on_scroll)
+
+    def set_rows(self, rows: List[str]) -> None:
+        self.rows = rows
+        _diff_listbox_rows(self.lb, self.shown, rows[:self.CHUNK])
+
+    def _on_scroll(self, first, last):
+        if float(last) >= 0.9 and len(self.shown) < len(self.rows):
+            self._load_to(len(self.shown) + self.CHUNK)
+
+    def _load_to(self, n: int) -> None:
+        more = self.rows[len(self.shown):n]
+        if more:
+            self.lb.insert("end", *more)
+            self.shown.extend(more)
+
+    def select_last(self) -> None:
+        if not self.rows: return
+        self._load_to(len(self.rows))
+        self.lb.select_set("end"); self.lb.see("end")
+
 class ComboField(ttk.Frame):
     def __init__(self, master, values: List[str], initial: str = "", allow_custom=True):
         super().__init__(master)
@@ -337,17 +643,17 @@ class KeyPickerField(ttk.Frame):
     def __init__(self, master, all_keys, initial=None, title_left="Available", title_right="Selected"):
         super().__init__(master)
         self.all_keys = list(dict.fromkeys(all_keys))
-        self.selected = []
+        # insertion-ordered set: O(1) membership/removal, keeps the pick order
+        self.selected: Dict[str, None] = {}
         if initial:
-            for k in initial:
-                if isinstance(k, str) and k not in self.selected:
-                    self.selected.append(k)
+            self.selected = dict.fromkeys(k for k in initial if isinstance(k, str))
 
         self.columnconfigure(0, weight=1); self.columnconfigure(1, weight=1)
 
         left = ttk.Frame(self); left.grid(row=0, column=0, sticky="nsew", padx=(0,8))
         ttk.Label(left, text=title_left).pack(anchor="w")
-        self.lb = tk.Listbox(left, selectmode="browse", height=10, exportselection=False)
+        self._lb_var = tk.StringVar(self)
+        self.lb = tk.Listbox(left, selectmode="browse", height=10, exportselection=False, listvariable=self._lb_var)
         self.lb.pack(fill="both", expand=True, pady=(4,0))
 
         btns = ttk.Frame(left); btns.pack(fill="x", pady=(6,0))
@@ -356,76 +662,54 @@ class KeyPickerField(ttk.Frame):
 
         right = ttk.Frame(self); right.grid(row=0, column=1, sticky="nsew")
         ttk.Label(right, text=title_right).pack(anchor="w")
-        self.sel = tk.Listbox(right, selectmode="browse", height=10, exportselection=False)
+        self._sel_var = tk.StringVar(self)
+        self.sel = tk.Listbox(right, selectmode="browse", height=10, exportselection=False, listvariable=self._sel_var)
         self.sel.pack(fill="both", expand=True, pady=(4,0))
 
         self._refill_available()
         self._sync_selected()
 
         # Click-outside clears selections (without stealing button clicks)
-        def _is_descendant(widget, container):
-            try:
-                w = widget
-                while w is not None:
-                    if w == container:
-                        return True
-                    w = getattr(w, "master", None)
-            except Exception:
-                pass
-            return False
+        _register_click_clear(self)
 
-        def _global_click_clear(event, self=self):
-            try:
-                if not _is_descendant(event.widget, self):
-                    self.lb.selection_clear(0, "end")
-                    self.sel.selection_clear(0, "end")
-            except Exception:
-                pass
-        self.winfo_toplevel().bind("<Button-1>", _global_click_clear, add="+")
+    def destroy(self):
+        _CLICK_CLEAR_PICKERS.discard(self)
+        super().destroy()
 
     def _refill_available(self):
-        self.lb.delete(0, "end")
-        for k in self.all_keys:
-            if k not in self.selected:
-                self.lb.insert("end", k)
+        _set_listbox_rows(self.lb, self._lb_var, [k for k in self.all_keys if k not in self.selected])
 
     def _sync_selected(self):
-        self.sel.delete(0, "end")
-        for k in self.selected:
-            self.sel.insert("end", k)
+        _set_listbox_rows(self.sel, self._sel_var, self.selected)
 
     def _add(self):
         if self.lb.curselection():
-            k = self.lb.get(self.lb.curselection()[0])
+            i = self.lb.curselection()[0]
+            k = self.lb.get(i)
             if k not in self.selected:
-                self.selected.append(k)
-                self._refill_available()
-                self._sync_selected()
+                self.selected[k] = None
+                # move just that row across rather than rewriting both lists
+                self.lb.delete(i); self.sel.insert("end", k)
         try:
             self.lb.selection_clear(0, "end"); self.sel.selection_clear(0, "end")
         except Exception:
             pass
 
     def _remove(self):
-        pick = None
+        # only rows on the selected side can be removed
         if self.sel.curselection():
-            pick = self.sel.get(self.sel.curselection()[0])
-        elif self.lb.curselection():
-            pick = self.lb.get(self.lb.curselection()[0])
-        if pick is not None and pick in self.selected:
-            self.selected = [x for x in self.selected if x != pick]
-            self._refill_available()
-            self._sync_selected()
+            i = self.sel.curselection()[0]
+            pick = self.sel.get(i)
+            if pick in self.selected:
+                del self.selected[pick]; self.sel.delete(i)
+                self._refill_available()
         try:
             self.lb.selection_clear(0, "end"); self.sel.selection_clear(0, "end")
         except Exception:
             pass
 
     def set(self, keys):
-        self.selected = []
-        for k in keys or []:
-            if isinstance(k, str) and k not in self.selected:
-                self.selected.append(k)
+        self.selected = dict.fromkeys(k for k in keys or [] if isinstance(k, str))
         self._refill_available()
         self._sync_selected()
 
@@ -440,10 +724,28 @@ class ComponentsField(ttk.Frame):
     - Single-select both sides
     - Reorder up/down + Clear
     """
-    def __init__(self, master, labels: List[str]):
+    # Category filter keywords, matched as substrings of the lowercased label
+    _CAT_WORDS = {
+        "materials":   ["ingot","ore","leather","cloth","hide","wood","herb","glass","crystal","thread","plate","plank","pane","powder"],
+        "armour":      ["helm","hood","chest","cuirass","breast","greave","legging","boot","glove","gaunt","cloak","belt","shield","armor","armour"],
+        "weapons":     ["sword","dagger","axe","mace","hammer","spear","bow","crossbow","staff","wand","polearm","halberd","glaive"],
+        "clothing":    ["robe","tunic","vest","pants","trouser","skirt","kilt","hat","mask","glove","boot","shoe","belt","cloak"],
+        "accessories": ["ring","amulet","necklace","talisman","bracelet","bracer","circlet"],
+        "trinkets":    ["vase","figurine","goblet","pendant","mirror","fan","charm","bead","box","brooch","tin","mask"],
+        "consumables": ["potion","elixir","tonic","draft","draught","oil","bomb","phial","tincture","ration","water","brew","tea"],
+    }
+    # One alternation per category: a single regex scan per label instead of a str.__contains__ per keyword
+    _CAT_PATTERNS = {cat: re.compile("|".join(map(re.escape, words))) for cat, words in _CAT_WORDS.items()}
+
+    def __init__(self, master, labels: Sequence[str], labels_lc: Optional[Sequence[Tuple[str, str]]] = None):
+        # labels must already be sorted and unique (see ALL_ITEMS_LABELS_SORTED)
         super().__init__(master)
-        self.all_labels = list(sorted(set(labels)))
-        self.selected: List[str] = []
+        self.all_labels = labels
+        # (label, lowercased label) pairs so filtering never re-lowercases;
+        # shared from the items index when the caller has them
+        self._labels_lc = labels_lc if labels_lc is not None else [(lab, lab.lower()) for lab in labels]
+        # insertion-ordered set: O(1) membership/removal, keeps the pick order
+        self.selected: Dict[str, None] = {}
 
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=1)
@@ -463,6 +765,8 @@ class ComponentsField(ttk.Frame):
         ttk.Label(left, text="Available").pack(anchor="w")
         self.lb = tk.Listbox(left, selectmode="browse", height=10, exportselection=False)
         self.lb.pack(fill="both", expand=True)
+        # The whole item catalog can match: only materialize rows as they scroll in
+        self._lb_rows = ListboxWindow(self.lb)
 
         ctr = ttk.Frame(self); ctr.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(6,0))
         ttk.Button(ctr, text="Add ▶", command=self._add).pack(side="left", expand=True, fill="x", padx=3)
@@ -473,82 +777,83 @@ class ComponentsField(ttk.Frame):
 
         right = ttk.Frame(self); right.grid(row=1, column=1, sticky="nsew")
         ttk.Label(right, text="Selected").pack(anchor="w")
-        self.sel = tk.Listbox(right, selectmode="browse", height=10, exportselection=False)
+        self._sel_var = tk.StringVar(self)
+        self.sel = tk.Listbox(right, selectmode="browse", height=10, exportselection=False, listvariable=self._sel_var)
         self.sel.pack(fill="both", expand=True)
 
         # Bindings
-        self.filter_var.trace_add("write", lambda *_: self._refill())
+        self._refill_after = None
+        self._shown: List[str] = []
+        self.filter_var.trace_add("write", lambda *_: self._schedule_refill())
         self.cat_combo.bind("<<ComboboxSelected>>", lambda e: self._refill())
 
-        # Click-outside selection clear
-        def _is_descendant(widget, container):
-            try:
-                w = widget
-                while w is not None:
-                    if w == container:
-                        return True
-                    w = getattr(w, "master", None)
-            except Exception:
-                pass
-            return False
-
-        def _global_click_clear(event, self=self):
-            try:
-                if not _is_descendant(event.widget, self):
-                    self.lb.selection_clear(0, "end")
-                    self.sel.selection_clear(0, "end")
-            except Exception:
-                pass
-        self.winfo_toplevel().bind("<Button-1>", _global_click_clear, add="+")
+        # Clear a list's selection when focus leaves it (buttons don't take
+        # focus, so Add/Remove/Up/Down still see the selection)
+        self.lb.bind("<FocusOut>", lambda e: self.lb.selection_clear(0, "end"))
+        self.sel.bind("<FocusOut>", lambda e: self.sel.selection_clear(0, "end"))
 
         self._refill()
 
     def _match_cat(self, label, cat):
-        L = label.lower()
+        return self._match_cat_lc(label.lower(), cat)
+
+    def _match_cat_lc(self, label_lc, cat):
+        # label_lc is already lowercased
         if cat in ("(all)","",None): return True
-        if cat == "materials":   return any(w in L for w in ["ingot","ore","leather","cloth","hide","wood","herb","glass","crystal","thread","plate","plank","pane","powder"])
-        if cat == "armour":      return any(w in L for w in ["helm","hood","chest","cuirass","breast","greave","legging","boot","glove","gaunt","cloak","belt","shield","armor","armour"])
-        if cat == "weapons":     return any(w in L for w in ["sword","dagger","axe","mace","hammer","spear","bow","crossbow","staff","wand","polearm","halberd","glaive"])
-        if cat == "clothing":    return any(w in L for w in ["robe","tunic","vest","pants","trouser","skirt","kilt","hat","mask","glove","boot","shoe","belt","cloak"])
-        if cat == "accessories": return any(w in L for w in ["ring","amulet","necklace","talisman","bracelet","bracer","circlet"])
-        if cat == "trinkets":    return any(w in L for w in ["vase","figurine","goblet","pendant","mirror","fan","charm","bead","box","brooch","tin","mask"])
-        if cat == "consumables": return any(w in L for w in ["potion","elixir","tonic","draft","draught","oil","bomb","phial","tincture","ration","water","brew","tea"])
-        if cat == "misc":        return True
-        return True
+        pat = self._CAT_PATTERNS.get(cat)
+        # "misc" and unknown categories match everything
+        return True if pat is None else bool(pat.search(label_lc))
+
+    def _schedule_refill(self):
+        # Debounce typing: only the last keystroke within 120 ms refills the list
+        if self._refill_after is not None:
+            self.after_cancel(self._refill_after)
+        self._refill_after = self.after(120, self._refill)
 
     def _refill(self):
+        self._refill_after = None
         flt = (self.filter_var.get() or "").strip().lower()
         cat = (self.cat_var.get() or "(all)").strip().lower()
-        items = [lab for lab in self.all_labels if (flt in lab.lower()) and self._match_cat(lab, cat)]
-        self.lb.delete(0, "end")
-        for lab in items:
-            self.lb.insert("end", lab)
+        items = [lab for lab, lc in self._labels_lc if (flt in lc) and self._match_cat_lc(lc, cat)]
+        if items == self._shown:
+            return
+        self._shown = items
+        self._lb_rows.set_rows(items)
+
+    def destroy(self):
+        if self._refill_after is not None:
+            try:
+                self.after_cancel(self._refill_after)
+            except Exception:
+                pass
+            self._refill_after = None
+        super().destroy()
 
     def _sync_sel(self):
-        self.sel.delete(0, "end")
-        for lab in self.selected:
-            self.sel.insert("end", lab)
+        _set_listbox_rows(self.sel, self._sel_var, self.selected)
 
     def _add(self):
         if self.lb.curselection():
             p = self.lb.get(self.lb.curselection()[0])
             if p not in self.selected:
-                self.selected.append(p)
-                self._sync_sel()
+                self.selected[p] = None
+                self.sel.insert("end", p)
         try:
             self.lb.selection_clear(0, "end"); self.sel.selection_clear(0, "end")
         except Exception:
             pass
 
     def _remove(self):
-        pick = None
         if self.sel.curselection():
-            pick = self.sel.get(self.sel.curselection()[0])
+            i = self.sel.curselection()[0]
+            pick = self.sel.get(i)
+            if pick in self.selected:
+                del self.selected[pick]; self.sel.delete(i)
         elif self.lb.curselection():
+            # picked on the available side: its row position on the right is unknown
             pick = self.lb.get(self.lb.curselection()[0])
-        if pick is not None:
-            self.selected = [s for s in self.selected if s != pick]
-            self._sync_sel()
+            if pick in self.selected:
+                del self.selected[pick]; self._sync_sel()
         try:
             self.lb.selection_clear(0, "end"); self.sel.selection_clear(0, "end")
         except Exception:
@@ -560,8 +865,10 @@ class ComponentsField(ttk.Frame):
             return
         i = sel[0]
         if i > 0:
-            self.selected[i-1], self.selected[i] = self.selected[i], self.selected[i-1]
-            self._sync_sel()
+            keys = list(self.selected)
+            keys[i-1], keys[i] = keys[i], keys[i-1]
+            self.selected = dict.fromkeys(keys)
+            self.sel.delete(i-1, i); self.sel.insert(i-1, *keys[i-1:i+1])
             self.sel.selection_set(i-1)
 
     def _down(self):
@@ -570,16 +877,18 @@ class ComponentsField(ttk.Frame):
             return
         i = sel[0]
         if i < len(self.selected)-1:
-            self.selected[i+1], self.selected[i] = self.selected[i], self.selected[i+1]
-            self._sync_sel()
+            keys = list(self.selected)
+            keys[i+1], keys[i] = keys[i], keys[i+1]
+            self.selected = dict.fromkeys(keys)
+            self.sel.delete(i, i+1); self.sel.insert(i, *keys[i:i+2])
             self.sel.selection_set(i+1)
 
     def _clear(self):
-        self.selected = []
+        self.selected = {}
         self._sync_sel()
 
     def set(self, labels):
-        self.selected = list(labels or [])
+        self.selected = dict.fromkeys(labels or [])
         self._sync_sel()
 
     def get(self):
@@ -587,6 +896,20 @@ class ComponentsField(ttk.Frame):
 
 # ---------- Form ----------
 
+def _parse_number(s: str):
+    """int/float for strings shaped like -?digits(.digits)?, else None (no regex)."""
+    s = s.strip()
+    body = s[1:] if s.startswith("-") else s
+    whole, dot, frac = body.partition(".")
+    if not whole.isdecimal():
+        return None
+    if not dot:
+        return int(s)
+    return float(s) if frac.isdecimal() else None
+
+# Keys edited through picker widgets rather than as raw JSON text
+_PICKER_KEYS = frozenset(("components","fixed_bonus","possible_bonus","fixed_resist","possible_resist","fixed_trait","possible_trait"))
+
 class KeyValueForm(ttk.Frame):
     def __init__(self, master, on_change=None):
         super().__init__(master)
@@ -606,28 +929,65 @@ class KeyValueForm(ttk.Frame):
         self.canvas.create_window((0,0), window=self.inner, anchor="nw")
         self.canvas.configure(yscrollcommand=self.scroll.set)
         self.canvas.pack(side="left", fill="both", expand=True); self.scroll.pack(side="right", fill="y")
-
-        self.raw_text = tk.Text(self, height=24)
-        try:
-            self.raw_text.configure(font=("Courier", 10))
-        except Exception:
-            pass
+        # Wheel scrolling only while the pointer is over this form, so the
+        # global binding never outlives it or fires for unrelated widgets
+        self.canvas.bind("<Enter>", self._bind_wheel)
+        self.canvas.bind("<Leave>", self._unbind_wheel)
+
+        # Raw JSON editor is built on first toggle; most sessions never open it
+        self.raw_text: Optional[tk.Text] = None
+
+    def _bind_wheel(self, _e=None):
+        self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+        self.canvas.bind_all("<Button-4>", self._on_wheel)
+        self.canvas.bind_all("<Button-5>", self._on_wheel)
+
+    def _unbind_wheel(self, e=None):
+        # Moving onto a field inside the form also sends <Leave> to the canvas;
+        # keep the binding while the pointer is still over one of its children
+        if e is not None:
+            try:
+                under = self.winfo_containing(e.x_root, e.y_root)
+            except (tk.TclError, KeyError):
+                under = None
+            path = str(self.canvas)
+            if under is not None and (str(under) == path or str(under).startswith(path + ".")):
+                return
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.unbind_all(seq)
+
+    def _on_wheel(self, e):
+        # Windows/macOS report delta; X11 sends Button-4/5
+        if getattr(e, "num", None) == 4 or getattr(e, "delta", 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        elif getattr(e, "num", None) == 5 or getattr(e, "delta", 0) < 0:
+            self.canvas.yview_scroll(1, "units")
 
     # Context: items tab sets this so "type" combobox scopes correctly
     def set_category_context(self, cat: str):
         self.context_category = (cat or '').lower()
 
+    def _ensure_raw_text(self) -> tk.Text:
+        if self.raw_text is None:
+            self.raw_text = tk.Text(self, height=24)
+            try:
+                self.raw_text.configure(font=("Courier", 10))
+            except Exception:
+                pass
+        return self.raw_text
+
     def toggle_raw(self):
         self.raw_mode = not self.raw_mode
         if self.raw_mode:
+            self._ensure_raw_text()
             for w in (self.canvas, self.scroll): w.pack_forget()
             self.raw_text.pack(fill="both", expand=True)
             self.raw_text.delete("1.0","end")
-            self.raw_text.insert("1.0", json.dumps(self.current_obj, ensure_ascii=False, indent=2))
+            self.raw_text.insert("1.0", _dumps_indented(self.current_obj))
             self.toggle_btn.config(text="Form View")
         else:
             try:
-                obj = json.loads(self.raw_text.get("1.0","end"))
+                obj = _loads_json(self.raw_text.get("1.0","end"))
                 self.set_object(obj)
             except Exception as e:
                 messagebox.showerror("Invalid JSON", str(e)); return
@@ -639,13 +999,17 @@ class KeyValueForm(ttk.Frame):
     def _refresh_raw_if_visible(self):
         # If raw mode is showing, update its content to the current object
         try:
-            if getattr(self, "raw_mode", False) and hasattr(self, "raw_text"):
+            if getattr(self, "raw_mode", False) and self.raw_text is not None:
                 self.raw_text.delete("1.0","end")
-                self.raw_text.insert("1.0", json.dumps(self.current_obj, ensure_ascii=False, indent=2))
+                self.raw_text.insert("1.0", _dumps_indented(self.current_obj))
         except Exception:
             pass
 
 
+    def _dumped_json(self, key: str, val: Any) -> str:
+        txt = getattr(self, "_dumped_fields", {}).get(key)
+        return txt if txt is not None else _dumps_indented(val)
+
     def _make_widget_for(self, key: str, val: Any):
             # Hide category (comes from file context on items)
             if key == "category":
@@ -659,11 +1023,8 @@ class KeyValueForm(ttk.Frame):
             # Type dropdown scoped by current file category
             if key == "type":
                 cat = (self.context_category or "").lower()
-                if cat and cat in TYPE_OPTIONS:
-                    options = TYPE_OPTIONS[cat]
-                else:
-                    # Fallback to union of all types
-                    options = sorted({t for arr in TYPE_OPTIONS.values() for t in arr})
+                # Fallback to union of all types
+                options = TYPE_OPTIONS.get(cat, _ALL_TYPES) if cat else _ALL_TYPES
                 w = ComboField(self.inner, options, str(val or ""))
                 return ("type_combo", w)
 
@@ -688,7 +1049,7 @@ class KeyValueForm(ttk.Frame):
             if key in ("bonus", "resist", "trait"):
                 text = tk.Text(self.inner, height=3, width=40)
                 try:
-                    text.insert("1.0", json.dumps(val, ensure_ascii=False, indent=2))
+                    text.insert("1.0", self._dumped_json(key, val))
                 except Exception:
                     text.insert("1.0", str(val))
                 text.configure(state="disabled")
@@ -706,7 +1067,7 @@ class KeyValueForm(ttk.Frame):
             # Dict/list -> JSON editor
             if isinstance(val, (dict, list)):
                 text = tk.Text(self.inner, height=4, width=40)
-                text.insert("1.0", json.dumps(val, ensure_ascii=False, indent=2))
+                text.insert("1.0", self._dumped_json(key, val))
                 return ("json", text)
 
             # Default scalar
@@ -733,21 +1094,20 @@ class KeyValueForm(ttk.Frame):
         self.current_obj.setdefault("fixed_trait", [])
         self.current_obj.setdefault("possible_trait", keys_from_legacy(self.current_obj.get("trait")))
 
+        # Serialize nested dict/list fields once up front (orjson when available);
+        # picker-backed keys never show JSON, so skip them
+        self._dumped_fields: Dict[str, str] = {}
+        for k, v in self.current_obj.items():
+            if isinstance(v, (dict, list)) and k not in _PICKER_KEYS:
+                try:
+                    self._dumped_fields[k] = _dumps_indented(v)
+                except Exception:
+                    pass
+
         # If Raw JSON pane is visible, update it right away
         if hasattr(self, "_refresh_raw_if_visible"):
             self._refresh_raw_if_visible()
 
-        # Rebuild UI
-        for w in self.inner.winfo_children():
-            w.destroy()
-        self.inputs.clear()
-
-        preferred = ["id","name","type","rarity","value","weight","description",
-                     "slot","category","components",
-                     "fixed_bonus","possible_bonus","fixed_resist","possible_resist","fixed_trait","possible_trait"]
-        keys = list(self.current_obj.keys())
-        keys_sorted = preferred + [k for k in keys if k not in preferred]
-
         # If components exist -> show as ComponentsField with labels from global index
         labels = None
         if "components" in self.current_obj and ALL_ITEMS_ID_TO_LABEL:
@@ -761,11 +1121,35 @@ class KeyValueForm(ttk.Frame):
                 else:
                     cid = str(c)
                 if cid:
-                    m8 = re.match(r"^([A-Z]{2,3})(\d{8})$", cid)
-                    if m8:
-                        cid = m8.group(1) + m8.group(2)[-6:]
-                    comp_ids.append(cid)
-            labels = [ALL_ITEMS_ID_TO_LABEL.get(cid, cid) for cid in comp_ids]
+                    comp_ids.append(_normalize_id8(cid))
+            id_to_label = ALL_ITEMS_ID_TO_LABEL.get
+            labels = [id_to_label(cid, cid) for cid in comp_ids]
+
+        # Same keys, value kinds and context as the last object: refill the
+        # existing widgets instead of destroying and re-gridding every row
+        schema = (self.context_category,
+                  ALL_ITEMS_LABELS_SORTED if ALL_ITEMS_ID_TO_LABEL else None,
+                  tuple((k, type(v).__name__) for k, v in self.current_obj.items()))
+        prev = getattr(self, "_last_schema", None)
+        if self.inputs and prev is not None and prev[0] == schema[0] \
+                and prev[1] is schema[1] and prev[2] == schema[2]:
+            for k, (kind, widget) in self.inputs.items():
+                self._fill_widget(k, kind, widget, labels)
+            self._derive_slot_field()
+            self._refresh_raw_if_visible()
+            return
+        self._last_schema = schema
+
+        # Rebuild UI
+        for w in self.inner.winfo_children():
+            w.destroy()
+        self.inputs.clear()
+
+        preferred = ["id","name","type","rarity","value","weight","description",
+                     "slot","category","components",
+                     "fixed_bonus","possible_bonus","fixed_resist","possible_resist","fixed_trait","possible_trait"]
+        keys = list(self.current_obj.keys())
+        keys_sorted = preferred + [k for k in keys if k not in preferred]
 
         row = 0
         for k in keys_sorted:
@@ -778,9 +1162,8 @@ class KeyValueForm(ttk.Frame):
             ttk.Label(self.inner, text=k).grid(row=row, column=0, sticky="w", padx=6, pady=4)
 
             if k == "components" and ALL_ITEMS_ID_TO_LABEL:
-                # Build a full label list for the available side
-                all_labels = list(ALL_ITEMS_ID_TO_LABEL.values())
-                widget = ComponentsField(self.inner, all_labels)
+                # Full label list for the available side, pre-sorted by rebuild_items_index
+                widget = ComponentsField(self.inner, ALL_ITEMS_LABELS_SORTED, ALL_ITEMS_LABELS_LC)
                 widget.set(labels or [])
                 self.inputs[k] = ("components_labels", widget)
                 widget.grid(row=row, column=1, sticky="we", padx=6, pady=4)
@@ -830,6 +1213,14 @@ class KeyValueForm(ttk.Frame):
         row += 1
 
         # derive slot once after layout if possible
+        self._derive_slot_field()
+        self.inner.columnconfigure(1, weight=1)
+
+        # Final sync of raw view after layout
+        if hasattr(self, "_refresh_raw_if_visible"):
+            self._refresh_raw_if_visible()
+
+    def _derive_slot_field(self):
         try:
             snap = {
                 "type": "",
@@ -846,16 +1237,37 @@ class KeyValueForm(ttk.Frame):
                 sl[1][1].set(inferred)
         except Exception:
             pass
-        self.inner.columnconfigure(1, weight=1)
 
-        # Final sync of raw view after layout
-        if hasattr(self, "_refresh_raw_if_visible"):
-            self._refresh_raw_if_visible()
+    def _fill_widget(self, key: str, kind: str, widget, labels):
+        # Push a new value into a widget built by set_object for the same schema
+        val = self.current_obj.get(key)
+        if kind == "components_labels":
+            widget.set(labels or [])
+        elif kind.endswith("_keys"):
+            widget.set([v for v in (val or []) if isinstance(v, str)])
+        elif kind in ("rarity_combo", "type_combo"):
+            widget.set(str(val or ""))
+        elif kind == "slot_readonly":
+            widget[1].set(str(val or ""))
+        elif kind in ("legacy_json", "multiline", "json"):
+            if kind == "multiline":
+                txt = "" if val is None else str(val)
+            else:
+                try:
+                    txt = self._dumped_json(key, val)
+                except Exception:
+                    txt = str(val)
+            widget.configure(state="normal")
+            widget.delete("1.0", "end"); widget.insert("1.0", txt)
+            if kind == "legacy_json":
+                widget.configure(state="disabled")
+        elif kind == "scalar":
+            widget.delete(0, "end"); widget.insert(0, "" if val is None else str(val))
 
     def get_object(self):
         if self.raw_mode:
             try:
-                return json.loads(self.raw_text.get("1.0","end"))
+                return _loads_json(self.raw_text.get("1.0","end"))
             except Exception as e:
                 messagebox.showerror("Invalid JSON", str(e))
                 return None
@@ -865,7 +1277,7 @@ class KeyValueForm(ttk.Frame):
                 continue
             elif kind == "json":
                 try:
-                    out[k] = json.loads(widget.get("1.0","end"))
+                    out[k] = _loads_json(widget.get("1.0","end"))
                 except Exception:
                     # keep as string/raw
                     out[k] = widget.get("1.0","end")
@@ -875,12 +1287,7 @@ class KeyValueForm(ttk.Frame):
                 except Exception:
                     out[k] = ""
             elif kind == "components_labels":
-                labels = widget.get()
-                ids = []
-                for lab in labels:
-                    iid = ALL_ITEMS_LABEL_TO_ID.get(lab)
-                    if iid: ids.append(iid)
-                out[k] = ids
+                out[k] = list(filter(None, map(ALL_ITEMS_LABEL_TO_ID.get, widget.get())))
             elif kind.endswith("_keys"):
                 out[k] = widget.get()
             elif kind == "slot_readonly":
@@ -892,10 +1299,8 @@ class KeyValueForm(ttk.Frame):
                     val = widget.get()
                 except Exception:
                     val = ""
-                if isinstance(val, str) and re.match(r"^-?\d+(\.\d+)?$", val.strip()):
-                    out[k] = float(val) if "." in val else int(val)
-                else:
-                    out[k] = val
+                num = _parse_number(val) if isinstance(val, str) else None
+                out[k] = val if num is None else num
         # derive slot
         try:
             out["slot"] = derive_slot(out)
@@ -910,9 +1315,8 @@ class KeyValueForm(ttk.Frame):
 
         # normalize IDs to 6-digit for id + components
         iid = str(out.get("id","")).strip()
-        m8 = re.match(r"^([A-Z]{2,3})(\d{8})$", iid)
-        if m8:
-            out["id"] = m8.group(1) + m8.group(2)[-6:]
+        if _RE_ID8.match(iid):
+            out["id"] = _normalize_id8(iid)
         comps = out.get("components", [])
         if isinstance(comps, list):
             cleaned = []
@@ -923,10 +1327,7 @@ class KeyValueForm(ttk.Frame):
                 else:
                     s = str(cid)
                 if s:
-                    m8 = re.match(r"^([A-Z]{2,3})(\d{8})$", s)
-                    if m8:
-                        s = m8.group(1) + m8.group(2)[-6:]
-                    cleaned.append(s)
+                    cleaned.append(_normalize_id8(s))
             out["components"] = cleaned
 
         return out
@@ -934,7 +1335,16 @@ class KeyValueForm(ttk.Frame):
 # ---------- Rolling / Weights ----------
 
 def _load_loot_config():
+    # Shared, cached result: callers must treat it as read-only
     cfg_path = os.path.join(BASE_DIR, "data", "meta", "loot_rolls.json")
+    try:
+        mtime_ns = os.stat(cfg_path).st_mtime_ns
+    except OSError:
+        mtime_ns = 0
+    return _load_loot_config_cached(cfg_path, mtime_ns)
+
+@functools.lru_cache(maxsize=2)
+def _load_loot_config_cached(cfg_path: str, mtime_ns: int):
     default = {
         "rarity_slots": {
             "bonus":  {"common": [0, 1], "uncommon": [1, 1], "rare": [2, 2], "epic": [3, 3], "legendary": [4, 4], "relic": [5, 5]},
@@ -947,8 +1357,7 @@ def _load_loot_config():
     }
     try:
         if os.path.exists(cfg_path):
-            with open(cfg_path, "r", encoding="utf-8") as f:
-                user = json.load(f)
+            user = _parse_json_file(cfg_path)
             def merge(a, b):
                 if isinstance(a, dict) and isinstance(b, dict):
                     out = dict(a)
@@ -969,24 +1378,20 @@ def _category_tag_for(item: dict) -> str:
     return cat or (slot or "misc")
 
 def _weighted_sample_without_replacement(candidates, weights_map, n, rng):
-    pool = [(c, max(0.000001, float(weights_map.get(c, 1)))) for c in candidates]
-    chosen = []
-    n = min(n, len(pool))
-    for _ in range(n):
-        total = sum(w for _, w in pool)
-        if total <= 0: break
-        r = rng.random() * total
-        upto = 0.0
-        pick_idx = None
-        for i,(c,w) in enumerate(pool):
-            upto += w
-            if r <= upto:
-                pick_idx = i; break
-        if pick_idx is None:
-            pick_idx = len(pool)-1
-        chosen.append(pool[pick_idx][0])
-        pool.pop(pick_idx)
-    return chosen
+    # Efraimidis-Spirakis A-Res: one pass, keep the n largest keys log(u)/w.
+    # Same distribution as repeated weighted draws, without rescanning the pool.
+    if n <= 0:
+        return []
+    heap = []
+    for i, c in enumerate(candidates):
+        w = max(0.000001, float(weights_map.get(c, 1)))
+        key = (math.log(1.0 - rng.random()) / w, i, c)
+        if len(heap) < n:
+            heapq.heappush(heap, key)
+        elif key > heap[0]:
+            heapq.heapreplace(heap, key)
+    # highest key first == the order sequential draws would have picked them
+    return [c for _, _, c in sorted(heap, reverse=True)]
 
 def _rarity_count(cfg, kind, rarity, rng):
     rr = cfg.get("rarity_slots",{}).get(kind,{}).get(str(rarity).lower())
@@ -996,6 +1401,17 @@ def _rarity_count(cfg, kind, rarity, rng):
     if hi < lo: lo, hi = hi, lo
     return rng.randint(lo, hi)
 
+def fmt_template_line(k: str, tpl: dict) -> str:
+    """Affix key padded to a column, plus its template range/value if any."""
+    v = tpl.get(k)
+    if isinstance(v, dict):
+        lo = v.get("min", v.get("lo", ""))
+        hi = v.get("max", v.get("hi", ""))
+        return f"{k:16} ~ {lo}-{hi}"
+    elif isinstance(v, (int,float)):
+        return f"{k:16} ~ {v}"
+    return f"{k:16}"
+
 class RollPreviewDialog(tk.Toplevel):
     def __init__(self, master, item_obj: dict):
         super().__init__(master)
@@ -1027,8 +1443,30 @@ class RollPreviewDialog(tk.Toplevel):
         frm.columnconfigure(1, weight=1)
         frm.rowconfigure(3, weight=1)
 
+        self._prepare_pools()
         self.roll_now()
 
+    def _prepare_pools(self):
+        # Item and config are fixed for the dialog's lifetime: build the affix
+        # pools and biased weight maps once instead of on every roll.
+        self.fixed_bonus     = tuple(self.item.get("fixed_bonus") or [])
+        self.possible_bonus  = tuple(k for k in (self.item.get("possible_bonus") or []) if k not in self.fixed_bonus)
+        self.fixed_resist    = tuple(self.item.get("fixed_resist") or [])
+        self.possible_resist = tuple(k for k in (self.item.get("possible_resist") or []) if k not in self.fixed_resist)
+        self.fixed_trait     = tuple(self.item.get("fixed_trait") or [])
+        self.possible_trait  = tuple(k for k in (self.item.get("possible_trait") or []) if k not in self.fixed_trait)
+
+        self.tag = _category_tag_for(self.item)
+        bias = (self.cfg.get("category_bias") or {}).get(self.tag, {})
+        bw = dict(self.cfg.get("global_bonus_weights") or {})
+        for k,v in (bias.get("bonus_weights") or {}).items():
+            if k in bw: bw[k] = bw[k]*float(v)
+        rw = dict(self.cfg.get("global_resist_weights") or {})
+        for k,v in (bias.get("resist_weights") or {}).items():
+            if k in rw: rw[k] = rw[k]*float(v)
+        self._bw, self._rw = bw, rw
+        self._tw = {k:1 for k in self.possible_trait}
+
     def roll_now(self):
         rarity = self.rarity_var.get().lower()
         seed_txt = self.seed_var.get().strip()
@@ -1037,66 +1475,35 @@ class RollPreviewDialog(tk.Toplevel):
             try: rng.seed(int(seed_txt))
             except ValueError: rng.seed(seed_txt)
 
-        fixed_bonus    = list(self.item.get("fixed_bonus") or [])
-        possible_bonus = [k for k in (self.item.get("possible_bonus") or []) if k not in fixed_bonus]
-        fixed_resist   = list(self.item.get("fixed_resist") or [])
-        possible_resist= [k for k in (self.item.get("possible_resist") or []) if k not in fixed_resist]
-        fixed_trait    = list(self.item.get("fixed_trait") or [])
-        possible_trait = [k for k in (self.item.get("possible_trait") or []) if k not in fixed_trait]
-
-        tag = _category_tag_for(self.item)
-        bias = (self.cfg.get("category_bias") or {}).get(tag, {})
-        bw = dict(self.cfg.get("global_bonus_weights") or {})
-        for k,v in (bias.get("bonus_weights") or {}).items():
-            if k in bw: bw[k] = bw[k]*float(v)
-        rw = dict(self.cfg.get("global_resist_weights") or {})
-        for k,v in (bias.get("resist_weights") or {}).items():
-            if k in rw: rw[k] = rw[k]*float(v)
-
+        tag = self.tag
         need_b = _rarity_count(self.cfg, "bonus", rarity, rng)
         need_r = _rarity_count(self.cfg, "resist", rarity, rng)
         need_t = _rarity_count(self.cfg, "trait", rarity, rng)
 
-        roll_b = _weighted_sample_without_replacement(possible_bonus, bw, max(0, need_b), rng)
-        roll_r = _weighted_sample_without_replacement(possible_resist, rw, max(0, need_r), rng)
-        tw = {k:1 for k in possible_trait}
-        roll_t = _weighted_sample_without_replacement(possible_trait, tw, max(0, need_t), rng)
+        roll_b = _weighted_sample_without_replacement(self.possible_bonus, self._bw, max(0, need_b), rng)
+        roll_r = _weighted_sample_without_replacement(self.possible_resist, self._rw, max(0, need_r), rng)
+        roll_t = _weighted_sample_without_replacement(self.possible_trait, self._tw, max(0, need_t), rng)
 
-        final_bonus  = fixed_bonus  + roll_b
-        final_resist = fixed_resist + roll_r
-        final_trait  = fixed_trait  + roll_t
+        final_bonus  = list(self.fixed_bonus)  + roll_b
+        final_resist = list(self.fixed_resist) + roll_r
+        final_trait  = list(self.fixed_trait)  + roll_t
 
         bt = self.item.get("bonus_template") or {}
         rt = self.item.get("resist_template") or self.item.get("defense_template") or {}
 
-        def fmt_template_line(k, tpl):
-            v = tpl.get(k)
-            if isinstance(v, dict):
-                lo = v.get("min", v.get("lo", ""))
-                hi = v.get("max", v.get("hi", ""))
-                return f"{k:16} ~ {lo}-{hi}"
-            elif isinstance(v, (int,float)):
-                return f"{k:16} ~ {v}"
-            return f"{k:16}"
-
-        lines = []
-        lines.append(f"Item: {self.item.get('id','?')} — {self.item.get('name','?')} [{tag}]")
-        lines.append(f"Rarity: {rarity}")
-        lines.append("")
-        lines.append("BONUS")
-        for k in final_bonus:
-            lines.append("  " + fmt_template_line(k, bt))
-        if not final_bonus: lines.append("  (none)")
-        lines.append("")
-        lines.append("RESIST")
-        for k in final_resist:
-            lines.append("  " + fmt_template_line(k, rt))
-        if not final_resist: lines.append("  (none)")
-        lines.append("")
-        lines.append("TRAIT")
-        for k in final_trait:
-            lines.append("  " + k)
-        if not final_trait: lines.append("  (none)")
+        lines = [
+            f"Item: {self.item.get('id','?')} — {self.item.get('name','?')} [{tag}]",
+            f"Rarity: {rarity}",
+            "",
+            "BONUS",
+            *(["  " + fmt_template_line(k, bt) for k in final_bonus] or ["  (none)"]),
+            "",
+            "RESIST",
+            *(["  " + fmt_template_line(k, rt) for k in final_resist] or ["  (none)"]),
+            "",
+            "TRAIT",
+            *(["  " + k for k in final_trait] or ["  (none)"]),
+        ]
 
         self.out.configure(state="normal")
         self.out.delete("1.0","end")
@@ -1105,15 +1512,138 @@ class RollPreviewDialog(tk.Toplevel):
 
 # ---------- Tabs ----------
 
-class ItemsTab(ttk.Frame):
+_LOAD_POOL: Optional[ThreadPoolExecutor] = None
+
+def _load_pool() -> ThreadPoolExecutor:
+    global _LOAD_POOL
+    if _LOAD_POOL is None:
+        _LOAD_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="entity-load")
+    return _LOAD_POOL
+
+class DatasetFilesMixin:
+    """File list handling shared by ItemsTab and NPCsTab.
+
+    load_datasets() lists the folder and hands every file to a worker thread
+    (read_dataset); results are installed on the Tk thread, either when a
+    file is first needed (_dataset) or by _poll_loading as they finish.
+    """
+    DATA_DIR = ""
+    FOLDER_LABEL = ""
+    ALL_LABEL = ""
+    LOAD_KW: Dict[str, Any] = {}
+
+    def _init_datasets(self):
+        # fname -> Dataset once installed, None while still loading
+        self.datasets: Dict[str, Optional[Dataset]] = {}
+        self._loading: Dict[str, Tuple[str, Future]] = {}
+        self._poll_after = None
+        self._waiting_all = False
+
+    def _accept(self, root, lst, list_key) -> bool:
+        return isinstance(lst, list)
+
+    def _datasets_changed(self):
+        pass
+
+    def _clear_view(self):
+        pass
+
+    def load_datasets(self):
+        for _path, fut in self._loading.values():
+            fut.cancel()
+        self.datasets.clear(); self._loading.clear()
+        if not os.path.isdir(self.DATA_DIR):
+            messagebox.showwarning("Missing folder", f"{self.FOLDER_LABEL} directory not found: {self.DATA_DIR}")
+            return
+        files_found = []
+        pool = _load_pool()
+        for fname, entry in discover_json_files(self.DATA_DIR):
+            self.datasets[fname] = None
+            self._loading[fname] = (entry.path, pool.submit(read_dataset, entry.path, st=entry.stat(), **self.LOAD_KW))
+            files_found.append(fname)
+        if not files_found:
+            self.file_combo.set(""); self._clear_view(); return
+        self.file_combo["values"] = [self.ALL_LABEL] + files_found
+        self.file_combo.set(self.ALL_LABEL)
+        self._schedule_poll()
+        self.on_file_change()
+
+    def _install(self, fname: str) -> bool:
+        """Move a finished (or awaited) load into self.datasets; True if one was installed."""
+        pending = self._loading.pop(fname, None)
+        if pending is None:
+            return False
+        path, fut = pending
+        try:
+            loaded = fut.result()
+        except json.JSONDecodeError as exc:
+            show_parse_error(path, exc); loaded = None
+        except Exception:
+            loaded = None
+        if loaded and self._accept(*loaded):
+            root, lst, list_key = loaded
+            self.datasets[fname] = Dataset(fname, path, root, list_key, lst)
+            return True
+        self.datasets.pop(fname, None)
+        self.file_combo["values"] = [v for v in self.file_combo["values"] if v != fname]
+        return False
+
+    def _dataset(self, fname: str) -> Optional[Dataset]:
+        """fname's Dataset, waiting for its load if it hasn't finished yet."""
+        if self._install(fname):
+            self._datasets_changed()
+        return self.datasets.get(fname)
+
+    def _schedule_poll(self):
+        if self._poll_after is None and self._loading:
+            self._poll_after = self.after(50, self._poll_loading)
+
+    def _poll_loading(self):
+        self._poll_after = None
+        done = [name for name, (_path, fut) in self._loading.items() if fut.done()]
+        if any([self._install(name) for name in done]):
+            self._datasets_changed()
+        if self._loading:
+            self._schedule_poll()
+        elif self._waiting_all:
+            self._waiting_all = False
+            if self.file_combo.get() == self.ALL_LABEL:
+                self.on_file_change()
+
+    def _all_loaded(self) -> bool:
+        """For the aggregate view: False (and re-run on_file_change later) while files are loading."""
+        if not self._loading:
+            return True
+        self._waiting_all = True
+        self._schedule_poll()
+        try:
+            self.count_var.set("Loading…")
+        except Exception:
+            pass
+        return False
+
+class ItemsTab(DatasetFilesMixin, ttk.Frame):
+    DATA_DIR = ITEMS_DIR
+    FOLDER_LABEL = "Items"
+    ALL_LABEL = "(All Item files)"
+    LOAD_KW = {"preferred_keys": ("items","entries","records"), "allow_first_list": True}
+
     def __init__(self, master):
         super().__init__(master)
-        self.datasets: Dict[str, Dataset] = {}
+        self._init_datasets()
+        self._item_labels: Dict[str, Tuple[list, Dict[str, str]]] = {}   # fname -> (ds.data, item_labels(ds.data))
+        self._dirty_datasets: set = set()
         self.active_dataset: Optional[Dataset] = None
         self.active_file = None
         self.active_list: List[dict] = []
         self.filtered_indices: List[int] = []
         self.selected_index: Optional[int] = None
+        self._search_cache: List[Tuple[str, str, str, str, str]] = []
+        self._cat_values: List[str] = ["(all)"]
+        self._cat_cache: Dict[int, tuple] = {}
+        self._last_filter: Optional[tuple] = None
+        self._id_counts: Counter = Counter()
+        self._selected_old_id: Optional[str] = None
 
         left = ttk.Frame(self); right = ttk.Frame(self)
         left.pack(side="left", fill="y", padx=6, pady=6)
@@ -1130,7 +1660,10 @@ class ItemsTab(ttk.Frame):
         ttk.Label(left, text="Search").pack(anchor="w")
         self.search_var = tk.StringVar()
         ent = ttk.Entry(left, textvariable=self.search_var); ent.pack(fill="x", pady=(0,6))
-        ent.bind("<KeyRelease>", lambda e: self.refresh_list())
+        self._refresh_after = None
+        # trace rather than <KeyRelease>, so pastes and deletes via the mouse refilter too
+        self.search_var.trace_add("write", self._schedule_refresh)
+        ent.bind("<Return>", lambda e: self.refresh_list())
 
         ttk.Label(left, text="Category Filter").pack(anchor="w")
         self.cat_combo = ttk.Combobox(left, state="readonly")
@@ -1144,6 +1677,7 @@ class ItemsTab(ttk.Frame):
         self.type_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_list())
 
         self.listbox = tk.Listbox(left, height=24); self.listbox.pack(fill="both", expand=True)
+        self._rows = ListboxWindow(self.listbox)
         self.listbox.bind("<<ListboxSelect>>", self.on_select)
 
         btns = ttk.Frame(left); btns.pack(fill="x", pady=6)
@@ -1157,37 +1691,30 @@ class ItemsTab(ttk.Frame):
         self.load_datasets()
 
     def rebuild_global_items_index(self):
-        all_lists = [ds.data for ds in self.datasets.values()]
-        rebuild_items_index(all_lists)
-
-    def load_datasets(self):
-        self.datasets.clear()
-        if not os.path.isdir(ITEMS_DIR):
-            messagebox.showwarning("Missing folder", f"Items directory not found: {ITEMS_DIR}")
-            return
-        files_found = []
-        for fname in discover_json_files(ITEMS_DIR):
-            path = os.path.join(ITEMS_DIR, fname)
-            loaded = load_dataset(path, preferred_keys=("items","entries","records"), allow_first_list=True)
-            if not loaded: continue
-            root, lst, list_key = loaded
-            if not isinstance(lst, list): continue
-            self.datasets[fname] = Dataset(fname, path, root, list_key, lst)
-            files_found.append(fname)
-        if not files_found:
-            self.file_combo.set(""); self.cat_combo["values"] = []
-            self.listbox.delete(0,"end"); self.form.set_object({}); return
+        # Only files marked dirty, or whose data list was replaced (first load,
+        # reload, save), are relabelled; the others reuse their cached map
+        labels = self._item_labels
+        for fname, ds in self.datasets.items():
+            if ds is None: continue
+            cached = labels.get(fname)
+            if cached is None or cached[0] is not ds.data or fname in self._dirty_datasets:
+                labels[fname] = (ds.data, item_labels(ds.data))
+        self._dirty_datasets.clear()
+        install_items_index(labels[f][1] for f, ds in self.datasets.items() if ds is not None)
+
+    def _datasets_changed(self):
         self.rebuild_global_items_index()
-        self.file_combo["values"] = ["(All Item files)"] + files_found; self.file_combo.current(0)
-        self.file_combo.set("(All Item files)")
-        self.on_file_change()
+
+    def _clear_view(self):
+        self.cat_combo["values"] = []
+        self._rows.set_rows([]); self.form.set_object({})
 
     def on_file_change(self, *_):
         fname = self.file_combo.get()
-        dataset = self.datasets.get(fname)
 
         # Handle aggregate mode first
         if fname == "(All Item files)":
+            if not self._all_loaded(): return
             self.active_dataset = None
             self.active_file = None
             all_items = []
@@ -1203,10 +1730,9 @@ class ItemsTab(ttk.Frame):
             for btn_name in ("btn_new","btn_dup","btn_del","btn_save"):
                 if hasattr(self, btn_name):
                     getattr(self, btn_name).state(["disabled"])
-            # Filters
-            cats = get_all_categories(self.active_list) if self.active_list else ["(all)"]
+            # Filters (category values are filled in by refresh_list)
             try:
-                self.cat_combo["values"] = cats; self.cat_combo.set("(all)")
+                self.cat_combo.set("(all)")
             except Exception:
                 pass
             try:
@@ -1221,14 +1747,19 @@ class ItemsTab(ttk.Frame):
                 self.form.set_category_context("")
             except Exception:
                 pass
+            self._rebuild_search_cache()
+            self._id_counts = count_ids(self.active_list)
             self.refresh_list()
             return
 
         # Single-file mode
+        dataset = self._dataset(fname)
         if not dataset:
             # Unknown file selection; clear view
             self.active_dataset = None; self.active_file = None; self.active_list = []
-            self.listbox.delete(0,"end")
+            self._rebuild_search_cache()
+            self._id_counts = count_ids(self.active_list)
+            self._rows.set_rows([])
             try:
                 self.count_var.set("Entries: 0")
             except Exception:
@@ -1247,14 +1778,17 @@ class ItemsTab(ttk.Frame):
             if hasattr(self, btn_name):
                 getattr(self, btn_name).state(["!disabled"])
 
-        # Filters
-        cats = get_all_categories(self.active_list) if self.active_list else ["(all)"]
+        # Filters (category values are filled in by refresh_list)
         try:
-            self.cat_combo["values"] = cats; self.cat_combo.set("(all)")
+            self.cat_combo.set("(all)")
         except Exception:
             pass
-        try:
+        if dataset.filters is None:
             types = sorted({(it.get("type") or "").strip() for it in self.active_list if (it.get("type") or "").strip()})
+            dataset.filters = (build_item_rows(self.active_list, self._cat_cache), types)
+        (self._cat_values, self._search_cache), types = dataset.filters
+        self._last_filter = None
+        try:
             if hasattr(self, "type_combo"):
                 self.type_combo["values"] = ["(all)"] + types; self.type_combo.set("(all)")
         except Exception:
@@ -1272,12 +1806,36 @@ class ItemsTab(ttk.Frame):
             self.form.set_category_context(context_cat)
         except Exception:
             pass
+        self._id_counts = count_ids(self.active_list)
         self.refresh_list()
 
 
 
+    def _schedule_refresh(self, *_):
+        # Debounce typing: only the last edit within 150 ms refilters the list
+        if self._refresh_after is not None:
+            self.after_cancel(self._refresh_after)
+        self._refresh_after = self.after(150, self.refresh_list)
+
+    def _cancel_refresh(self):
+        # Any direct refresh_list supersedes a pending debounced one (e.g. the
+        # search_var.set("") in on_file_change)
+        if self._refresh_after is not None:
+            self.after_cancel(self._refresh_after)
+            self._refresh_after = None
+
+    def _rebuild_search_cache(self):
+        # Rebuilt whenever active_list changes (file switch, new/dup/del/save);
+        # _cat_cache keeps rows of untouched items so only new/edited ones are
+        # classified again
+        self._cat_values, self._search_cache = build_item_rows(self.active_list or [], self._cat_cache)
+        self._last_filter = None
+        if self.active_dataset is not None:
+            self.active_dataset.filters = None
+
     def refresh_list(self):
         # Robust refresh that works in single-file and "(All Item files)" mode
+        self._cancel_refresh()
         q = (self.search_var.get() or "").lower().strip()
         cat = (self.cat_combo.get() or "(all)")
         try:
@@ -1285,34 +1843,23 @@ class ItemsTab(ttk.Frame):
         except Exception:
             itype = "(all)"
 
-        items = list(self.active_list or [])
-        self.listbox.delete(0, "end")
-        self.filtered_indices = []
-
-        for i, it in enumerate(items):
-            show = True
-            name = str(it.get("name","") or "")
-            iid  = str(it.get("id","") or "")
-            if q and (q not in name.lower()) and (q not in iid.lower()):
-                show = False
-            if show and cat and cat != "(all)":
-                try:
-                    from_category = infer_category(it)
-                except Exception:
-                    from_category = ""
-                if from_category != cat:
-                    show = False
-            if show and itype and itype != "(all)":
-                if (it.get("type","") or "") != itype:
-                    show = False
-            if show:
-                self.filtered_indices.append(i)
-                label = f"{iid} — {name} [{infer_category(it)}]"
-                self.listbox.insert("end", label)
+        # Typing one more character can only narrow the result: rescan just
+        # the previous matches when the other filters are unchanged
+        last = self._last_filter
+        candidates = None
+        if last and last[0] and q.startswith(last[0]) and last[1:] == (cat, itype):
+            candidates = self.filtered_indices
+        self._last_filter = (q, cat, itype)
+        self.filtered_indices, lines = scan_items(self._search_cache, q, cat, itype, candidates)
+        try:
+            self.cat_combo["values"] = self._cat_values
+        except Exception:
+            pass
+        self._rows.set_rows(lines)
 
         # Count label
         try:
-            total = len(items)
+            total = len(self._search_cache)
             shown = len(self.filtered_indices)
             if q or (cat and cat != "(all)") or (itype and itype != "(all)"):
                 self.count_var.set(f"Entries: {total} • showing {shown}")
@@ -1329,6 +1876,7 @@ class ItemsTab(ttk.Frame):
         if not sel: return
         idx = self.filtered_indices[sel[0]]
         self.selected_index = idx
+        self._selected_old_id = self.active_list[idx].get("id")
         # Update form category context from selected item
         cat = (self.active_list[idx].get("category") or "").lower()
         self.form.set_category_context(cat)
@@ -1338,8 +1886,8 @@ class ItemsTab(ttk.Frame):
         if not self.active_dataset:
             messagebox.showinfo("All NPC files", "Select a single NPC file to add a new NPC.")
             return
-        existing_ids = {it.get("id","") for it in self.active_list}
-        item = dict(DEFAULT_ITEM); item["id"] = ensure_item_id(item, existing_ids)
+        item = dict(DEFAULT_ITEM); item["id"] = ensure_item_id(item, self._id_counts)
+        self._id_counts[item["id"]] += 1
         # If current filter is on a category: seed it
         cur = self.cat_combo.get()
         if cur and cur != "(all)":
@@ -1348,24 +1896,29 @@ class ItemsTab(ttk.Frame):
                 k, v = cur.split(":",1)
                 if k == "category":
                     item["category"] = v
-        self.active_list.append(item); self.refresh_list(); self.listbox.select_set("end"); self.on_select()
+        self.active_list.append(item); self._rebuild_search_cache(); self.refresh_list(); self._rows.select_last(); self.on_select()
 
     def on_dup(self):
         if self.selected_index is None or not self.active_dataset:
             messagebox.showinfo("All NPC files", "Select a single NPC file to duplicate into.")
             return
         src = dict(self.active_list[self.selected_index])
-        existing_ids = {it.get("id","") for it in self.active_list}
-        src["id"] = ensure_item_id(src, existing_ids)
-        self.active_list.append(src); self.refresh_list(); self.listbox.select_set("end"); self.on_select()
+        src["id"] = ensure_item_id(src, self._id_counts)
+        self._id_counts[src["id"]] += 1
+        self.active_list.append(src); self._rebuild_search_cache(); self.refresh_list(); self._rows.select_last(); self.on_select()
 
     def on_del(self):
         if self.selected_index is None or not self.active_dataset:
             messagebox.showinfo("All NPC files", "Select a single NPC file to delete from.")
             return
         if not messagebox.askyesno("Delete item", "Delete the selected item?"): return
-        del self.active_list[self.selected_index]
-        self.rebuild_global_items_index(); self.refresh_list()
+        gone = self.active_list.pop(self.selected_index)
+        if "id" in gone: uncount_id(self._id_counts, gone["id"])
+        self._rebuild_search_cache()
+        if self.active_dataset.data is self.active_list:
+            # only already-saved lists are shared with the index (see on_file_change)
+            self._dirty_datasets.add(self.active_file); self.rebuild_global_items_index()
+        self.refresh_list()
 
     def on_save(self):
         dataset = self.active_dataset
@@ -1377,11 +1930,12 @@ class ItemsTab(ttk.Frame):
             if obj is None: return
             # normalize any legacy 8-digit IDs to 6-digit
             if isinstance(obj.get("id"), str):
-                m8 = re.match(r"^([A-Z]{2,3})(\d{8})$", obj["id"])
-                if m8:
-                    obj["id"] = m8.group(1) + m8.group(2)[-6:]
-            ids = {it.get("id","") for idx, it in enumerate(self.active_list) if idx != self.selected_index}
-            obj["id"] = ensure_item_id(obj, ids)
+                obj["id"] = _normalize_id8(obj["id"])
+            # id the entry had when it was selected; the form may have renamed it
+            if self._selected_old_id is not None: uncount_id(self._id_counts, self._selected_old_id)
+            obj["id"] = ensure_item_id(obj, self._id_counts)
+            self._id_counts[obj["id"]] += 1
+            self._selected_old_id = obj["id"]
             try: obj["slot"] = derive_slot(obj)
             except Exception: pass
             for legacy in ("bonus","resist","trait"):
@@ -1389,7 +1943,8 @@ class ItemsTab(ttk.Frame):
             self.active_list[self.selected_index] = obj
         dataset.data = self.active_list
         save_json_file(dataset.path, dataset.root, dataset.data, dataset.list_key)
-        self.rebuild_global_items_index()
+        self._rebuild_search_cache()
+        self._dirty_datasets.add(dataset.file_name); self.rebuild_global_items_index()
         messagebox.showinfo("Saved", f"Saved {dataset.file_name}")
 
     def on_roll_preview(self):
@@ -1400,16 +1955,24 @@ class ItemsTab(ttk.Frame):
             item.setdefault(fld, [])
         RollPreviewDialog(self, item)
 
-class NPCsTab(ttk.Frame):
+class NPCsTab(DatasetFilesMixin, ttk.Frame):
+    DATA_DIR = NPCS_DIR
+    FOLDER_LABEL = "NPC"
+    ALL_LABEL = "(All NPC files)"
+    LOAD_KW = {"preferred_keys": ("npcs",), "allow_first_list": False, "fallback_key": "npcs"}
 
     def __init__(self, master):
         super().__init__(master)
-        self.datasets: Dict[str, Dataset] = {}
+        self._init_datasets()
         self.active_dataset: Optional[Dataset] = None
         self.active_file = None
         self.npcs: List[dict] = []
         self.filtered_indices: List[int] = []
         self.selected_index: Optional[int] = None
+        self._search_cache: List[Tuple[str, str, str, str, str, str, str]] = []
+        self._last_filter: Optional[tuple] = None
+        self._id_counts: Counter = Counter()
+        self._selected_old_id: Optional[str] = None
 
         left = ttk.Frame(self); left.pack(side="left", fill="y", padx=6, pady=6)
         right = ttk.Frame(self); right.pack(side="left", fill="both", expand=True, padx=6, pady=6)
@@ -1424,7 +1987,10 @@ class NPCsTab(ttk.Frame):
         ttk.Label(left, text="Search").pack(anchor="w")
         self.search_var = tk.StringVar()
         ent = ttk.Entry(left, textvariable=self.search_var); ent.pack(fill="x", pady=(0,6))
-        ent.bind("<KeyRelease>", lambda e: self.refresh_list())
+        self._refresh_after = None
+        # trace rather than <KeyRelease>, so pastes and deletes via the mouse refilter too
+        self.search_var.trace_add("write", self._schedule_refresh)
+        ent.bind("<Return>", lambda e: self.refresh_list())
 
         ttk.Label(left, text="Faction").pack(anchor="w")
         self.faction_combo = ttk.Combobox(left, state="readonly")
@@ -1453,6 +2019,7 @@ class NPCsTab(ttk.Frame):
         self.type_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_list())
 
         self.listbox = tk.Listbox(left, height=24); self.listbox.pack(fill="both", expand=True)
+        self._rows = ListboxWindow(self.listbox)
         self.listbox.bind("<<ListboxSelect>>", self.on_select)
 
         btns = ttk.Frame(left); btns.pack(fill="x", pady=6)
@@ -1462,42 +2029,32 @@ class NPCsTab(ttk.Frame):
         ttk.Button(btns, text="Save File", command=self.on_save).pack(side="left", expand=True, fill="x", padx=2)
 
         self.form = KeyValueForm(right); self.form.pack(fill="both", expand=True)
+        # The Items tab is shown first: don't read the NPC files until this tab is
+        self._map_bind_id = self.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, _event=None):
+        if self._map_bind_id is None: return
+        self.unbind("<Map>", self._map_bind_id); self._map_bind_id = None
         self.load_datasets()
 
-    def load_datasets(self):
-        self.datasets.clear()
-        if not os.path.isdir(NPCS_DIR):
-            messagebox.showwarning("Missing folder", f"NPC directory not found: {NPCS_DIR}")
-            return
-        files_found = []
-        for fname in discover_json_files(NPCS_DIR):
-            path = os.path.join(NPCS_DIR, fname)
-            loaded = load_dataset(path, preferred_keys=("npcs",), allow_first_list=False, fallback_key="npcs")
-            if not loaded: continue
-            root, lst, list_key = loaded
-            if isinstance(root, dict) and list_key != "npcs": continue
-            if not isinstance(lst, list): continue
-            self.datasets[fname] = Dataset(fname, path, root, list_key, lst)
-            files_found.append(fname)
-        if not files_found:
-            self.file_combo.set(""); self.faction_combo["values"] = []
-            self.listbox.delete(0,"end"); self.form.set_object({}); return
-        self.file_combo["values"] = ["(All NPC files)"] + files_found
-        self.file_combo.set("(All Item files)")
-        self.file_combo.set("(All NPC files)")
-        self.on_file_change()
+    def _accept(self, root, lst, list_key) -> bool:
+        return isinstance(lst, list) and not (isinstance(root, dict) and list_key != "npcs")
+
+    def _clear_view(self):
+        self.faction_combo["values"] = []
+        self._rows.set_rows([]); self.form.set_object({})
 
     def on_file_change(self, *_):
         fname = self.file_combo.get()
-        dataset = self.datasets.get(fname)
 
         # Handle aggregate mode BEFORE any early returns
         if fname == "(All NPC files)":
+            if not self._all_loaded(): return
             self.active_dataset = None
             self.active_file = None
             alln = []
             for ds in self.datasets.values():
-                if isinstance(ds.data, list):
+                if ds is not None and isinstance(ds.data, list):
                     alln.extend(ds.data)
             self.npcs = alln
             try:
@@ -1508,14 +2065,19 @@ class NPCsTab(ttk.Frame):
             for btn_name in ("btn_new","btn_dup","btn_del","btn_save"):
                 if hasattr(self, btn_name):
                     getattr(self, btn_name).state(["disabled"])
+            self._rebuild_search_cache()
+            self._id_counts = count_ids(self.npcs)
             self.refresh_filters()
             self.refresh_list()
             return
 
         # If no dataset for a specific file, clear and bail
+        dataset = self._dataset(fname)
         if not dataset:
             self.active_dataset = None; self.active_file = None; self.npcs = []
-            self.listbox.delete(0,"end"); self.form.set_object({})
+            self._rebuild_search_cache()
+            self._id_counts = count_ids(self.npcs)
+            self._rows.set_rows([]); self.form.set_object({})
             try:
                 self.faction_combo["values"] = []
                 self.count_var.set("Entries: 0")
@@ -1535,34 +2097,70 @@ class NPCsTab(ttk.Frame):
         for btn_name in ("btn_new","btn_dup","btn_del","btn_save"):
             if hasattr(self, btn_name):
                 getattr(self, btn_name).state(["!disabled"])
-        self.refresh_filters(); self.refresh_list()
+        self._rebuild_search_cache(); self.refresh_filters(); self.refresh_list()
+        self._id_counts = count_ids(self.npcs)
 
 
     def refresh_filters(self):
-        factions, sexes, races, classes, types = set(), set(), set(), set(), set()
-        for n in self.npcs:
-            factions.add((n.get("faction","") or "Neutral").strip() or "Neutral")
-            s = (n.get("sex","") or "").strip()
-            r = (n.get("race","") or "").strip()
-            c = (n.get("class","") or "").strip()
-            t = (n.get("type","") or "").strip()
-            if s: sexes.add(s)
-            if r: races.add(r)
-            if c: classes.add(c)
-            if t: types.add(t)
-        self.faction_combo["values"] = ["(all)"] + sorted(factions); self.faction_combo.set(self.faction_combo.get() or "(all)")
+        ds = self.active_dataset
+        if ds is not None and ds.filters is not None:
+            factions, sexes, races, classes, types = ds.filters
+        else:
+            # The search rows already hold the stripped filter fields
+            cols = list(zip(*self._search_cache))[1:6] or [()] * 5
+            factions, sexes, races, classes, types = (sorted(set(filter(None, col))) for col in cols)
+            if ds is not None:
+                ds.filters = (factions, sexes, races, classes, types)
+        self.faction_combo["values"] = ["(all)"] + factions; self.faction_combo.set(self.faction_combo.get() or "(all)")
         if hasattr(self, 'sex_combo'):
-            self.sex_combo["values"]   = ["(all)"] + sorted(sexes);   self.sex_combo.set(self.sex_combo.get() or "(all)")
+            self.sex_combo["values"]   = ["(all)"] + sexes;   self.sex_combo.set(self.sex_combo.get() or "(all)")
         if hasattr(self, 'race_combo'):
-            self.race_combo["values"]  = ["(all)"] + sorted(races);   self.race_combo.set(self.race_combo.get() or "(all)")
+            self.race_combo["values"]  = ["(all)"] + races;   self.race_combo.set(self.race_combo.get() or "(all)")
         if hasattr(self, 'class_combo'):
-            self.class_combo["values"] = ["(all)"] + sorted(classes); self.class_combo.set(self.class_combo.get() or "(all)")
+            self.class_combo["values"] = ["(all)"] + classes; self.class_combo.set(self.class_combo.get() or "(all)")
         if hasattr(self, 'type_combo'):
-            self.type_combo["values"]  = ["(all)"] + sorted(types);   self.type_combo.set(self.type_combo.get() or "(all)")
+            self.type_combo["values"]  = ["(all)"] + types;   self.type_combo.set(self.type_combo.get() or "(all)")
+
+    def _schedule_refresh(self, *_):
+        # Debounce typing: only the last edit within 150 ms refilters the list
+        if self._refresh_after is not None:
+            self.after_cancel(self._refresh_after)
+        self._refresh_after = self.after(150, self.refresh_list)
+
+    def _cancel_refresh(self):
+        # Any direct refresh_list supersedes a pending debounced one (e.g. the
+        # search_var.set("") in on_file_change)
+        if self._refresh_after is not None:
+            self.after_cancel(self._refresh_after)
+            self._refresh_after = None
+
+    def _rebuild_search_cache(self):
+        # (name_lower, faction, sex, race, class, type, listbox line) per NPC;
+        # rebuilt whenever self.npcs changes (file switch, new/dup/del/save)
+        # Filter fields repeat across NPCs: interned, rows share one string each
+        # and refresh_list's == usually hits the identity check
+        intern = sys.intern
+        rows = []
+        for n in self.npcs:
+            name = str(n.get("name",""))
+            rows.append((
+                name.lower(),
+                intern((n.get("faction","") or "Neutral").strip() or "Neutral"),
+                intern((n.get("sex","") or "").strip()),
+                intern((n.get("race","") or "").strip()),
+                intern((n.get("class","") or "").strip()),
+                intern((n.get("type","") or "").strip()),
+                f"{n.get('id','?')}  {name}",
+            ))
+        self._search_cache = rows
+        self._last_filter = None
 
     def refresh_list(self):
-        self.listbox.delete(0,"end"); self.filtered_indices = []
+        self._cancel_refresh()
+        prev = self.filtered_indices
+        self.filtered_indices = []
         if not self.npcs:
+            self._rows.set_rows([])
             self.form.set_object({})
             try:
                 self.count_var.set("Entries: 0")
@@ -1570,29 +2168,33 @@ class NPCsTab(ttk.Frame):
                 pass
             return
         q = (self.search_var.get() or "").lower().strip()
-        fac = (self.faction_combo.get() or "(all)").strip()
-        sex = (self.sex_combo.get() or "").strip() if hasattr(self, 'sex_combo') else ""
-        race = (self.race_combo.get() or "").strip() if hasattr(self, 'race_combo') else ""
-        clazz = (self.class_combo.get() or "").strip() if hasattr(self, 'class_combo') else ""
-        ntype = (self.type_combo.get() or "").strip() if hasattr(self, 'type_combo') else ""
-        for i, n in enumerate(self.npcs):
-            name = str(n.get("name",""))
-            show = True
-            if q and q not in name.lower(): show = False
-            if show and fac and fac != "(all)":
-                faction = (n.get("faction","") or "Neutral").strip() or "Neutral"
-                if faction != fac: show = False
-            if show and sex and sex != "(all)":
-                if (n.get("sex","") or "").strip() != sex: show = False
-            if show and race and race != "(all)":
-                if (n.get("race","") or "").strip() != race: show = False
-            if show and clazz and clazz != "(all)":
-                if (n.get("class","") or "").strip() != clazz: show = False
-            if show and ntype and ntype != "(all)":
-                if (n.get("type","") or "").strip() != ntype: show = False
-            if show:
-                self.filtered_indices.append(i)
-                self.listbox.insert("end", f"{n.get('id','?')}  {name}")
+        fac = sys.intern((self.faction_combo.get() or "(all)").strip())
+        sex = sys.intern((self.sex_combo.get() or "").strip()) if hasattr(self, 'sex_combo') else ""
+        race = sys.intern((self.race_combo.get() or "").strip()) if hasattr(self, 'race_combo') else ""
+        clazz = sys.intern((self.class_combo.get() or "").strip()) if hasattr(self, 'class_combo') else ""
+        ntype = sys.intern((self.type_combo.get() or "").strip()) if hasattr(self, 'type_combo') else ""
+        # Typing one more character can only narrow the result: rescan just
+        # the previous matches when the other filters are unchanged
+        rows = self._search_cache
+        others = (fac, sex, race, clazz, ntype)
+        last = self._last_filter
+        if last and last[0] and q.startswith(last[0]) and last[1:] == others:
+            candidates = prev
+        else:
+            candidates = range(len(rows))
+        self._last_filter = (q,) + others
+        indices: List[int] = []; lines: List[str] = []
+        for i in candidates:
+            name_lc, faction, n_sex, n_race, n_class, n_type, line = rows[i]
+            if q and q not in name_lc: continue
+            if fac and fac != "(all)" and faction != fac: continue
+            if sex and sex != "(all)" and n_sex != sex: continue
+            if race and race != "(all)" and n_race != race: continue
+            if clazz and clazz != "(all)" and n_class != clazz: continue
+            if ntype and ntype != "(all)" and n_type != ntype: continue
+            indices.append(i); lines.append(line)
+        self.filtered_indices = indices
+        self._rows.set_rows(lines)
         self.selected_index = None; self.form.set_object({})
         try:
             total = len(self.npcs)
@@ -1610,6 +2212,7 @@ class NPCsTab(ttk.Frame):
         if not sel: return
         idx = self.filtered_indices[sel[0]]
         self.selected_index = idx
+        self._selected_old_id = self.npcs[idx].get("id")
         # Ensure new text fields are present for editing
         try:
             npc = self.npcs[idx]
@@ -1624,21 +2227,24 @@ class NPCsTab(ttk.Frame):
 
     def on_new(self):
         if not self.active_dataset: return
-        existing_ids = {n.get("id","") for n in self.npcs}
-        npc = dict(DEFAULT_NPC); npc["id"] = ensure_npc_id(npc, existing_ids)
-        self.npcs.append(npc); self.refresh_filters(); self.refresh_list(); self.listbox.select_set("end"); self.on_select()
+        npc = dict(DEFAULT_NPC); npc["id"] = ensure_npc_id(npc, self._id_counts)
+        self._id_counts[npc["id"]] += 1
+        self.npcs.append(npc); self.active_dataset.filters = None; self._rebuild_search_cache(); self.refresh_filters(); self.refresh_list(); self._rows.select_last(); self.on_select()
 
     def on_dup(self):
         if self.selected_index is None or not self.active_dataset: return
         src = dict(self.npcs[self.selected_index])
-        existing_ids = {n.get("id","") for n in self.npcs}
-        src["id"] = ensure_npc_id(src, existing_ids)
-        self.npcs.append(src); self.refresh_list(); self.listbox.select_set("end"); self.on_select()
+        src["id"] = ensure_npc_id(src, self._id_counts)
+        self._id_counts[src["id"]] += 1
+        self.npcs.append(src); self.active_dataset.filters = None; self._rebuild_search_cache(); self.refresh_list(); self._rows.select_last(); self.on_select()
 
     def on_del(self):
         if self.selected_index is None or not self.active_dataset: return
         if not messagebox.askyesno("Delete NPC", "Delete the selected NPC?"): return
-        del self.npcs[self.selected_index]; self.refresh_filters(); self.refresh_list()
+        gone = self.npcs.pop(self.selected_index)
+        if "id" in gone: uncount_id(self._id_counts, gone["id"])
+        self.active_dataset.filters = None
+        self._rebuild_search_cache(); self.refresh_filters(); self.refresh_list()
 
     def on_save(self):
         dataset = self.active_dataset
@@ -1648,14 +2254,16 @@ class NPCsTab(ttk.Frame):
             if obj is None: return
             # normalize any legacy 8-digit IDs to 6-digit
             if isinstance(obj.get("id"), str):
-                m8 = re.match(r"^([A-Z]{2,3})(\d{8})$", obj["id"])
-                if m8:
-                    obj["id"] = m8.group(1) + m8.group(2)[-6:]
-            ids = {n.get("id","") for idx, n in enumerate(self.npcs) if idx != self.selected_index}
-            obj["id"] = ensure_npc_id(obj, ids)
+                obj["id"] = _normalize_id8(obj["id"])
+            # id the entry had when it was selected; the form may have renamed it
+            if self._selected_old_id is not None: uncount_id(self._id_counts, self._selected_old_id)
+            obj["id"] = ensure_npc_id(obj, self._id_counts)
+            self._id_counts[obj["id"]] += 1
+            self._selected_old_id = obj["id"]
             self.npcs[self.selected_index] = obj
-        dataset.data = self.npcs
+        dataset.data = self.npcs; dataset.filters = None
         save_json_file(dataset.path, dataset.root, dataset.data, dataset.list_key)
+        self._rebuild_search_cache()
         messagebox.showinfo("Saved", f"Saved {dataset.file_name}")
 
 # ---------- App ----------
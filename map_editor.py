@@ -1,13 +1,24 @@
 
 import os
+import sys
 import json
 import math
 import copy
+import shutil
+import tempfile
+import functools
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 import pygame
 
+# Optional C-accelerated JSON; the stdlib json module is used when missing
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # Safe mouse position helper for wheel/hover hit-testing across modules
 def get_mouse_pos() -> Tuple[int, int]:
     try:
@@ -60,6 +71,19 @@ EDGE_LIGHT = GRID_LINE      # thin light outline
 SAFE_TINT_RGBA   = (50, 180, 90, 60)
 DANGER_TINT_RGBA = (200, 70, 70, 60)
 
+def _tinted(rgb, rgba):
+    a = rgba[3] / 255.0
+    return tuple(int(c * (1.0 - a) + t * a) for c, t in zip(rgb, rgba[:3]))
+
+# Top view tile fill per (walkable * 4 + encounter code), tint pre-blended,
+# as bytes.translate tables for building the background one channel at a time.
+# Named encounters (code 3) tint like danger, as any non-"safe" value did
+_TOP_COLORS = tuple(
+    c for base in (IMPASSABLE, LIGHT_WALKABLE)
+    for c in (base, _tinted(base, SAFE_TINT_RGBA), _tinted(base, DANGER_TINT_RGBA), _tinted(base, DANGER_TINT_RGBA))
+)
+_TOP_CHANNELS = tuple(bytes(c[i] for c in _TOP_COLORS).ljust(256, b"\0") for i in range(3))
+
 # Dot colors
 COL_RED    = (220,70,70)     # enemies
 COL_GREEN  = (80,200,120)    # allies
@@ -97,7 +121,7 @@ def _load_subcat_json(base_dir: str, subcats: list[str]) -> list[dict]:
     out: list[dict] = []
     for sub in subcats:
         path = os.path.join(base_dir, f"{sub}.json")
-        data = read_json_list(path)
+        data = read_json_list_cached(path)
         for e in data:
             if isinstance(e, dict):
                 e2 = dict(e)
@@ -167,8 +191,13 @@ def _as_list(obj: Any) -> List[Dict[str, Any]]:
 
 def read_json_any(path: str, default: Any) -> Any:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        if orjson is not None:
+            if raw.startswith(b"\xef\xbb\xbf"):
+                raw = raw[3:]
+            return orjson.loads(raw)
+        return json.loads(raw)
     except FileNotFoundError:
         return default
     except json.JSONDecodeError as e:
@@ -178,25 +207,121 @@ def read_json_any(path: str, default: Any) -> Any:
         print(f"[editor] Unexpected error reading {path}: {e}")
         return default
 
+# Parsed JSON per path: path -> (mtime_ns, size, data)
+_JSON_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+_MISSING = object()
+
+def read_json_cached(path: str, default: Any) -> Any:
+    """Like read_json_any, but reuses the last parse while the file's mtime and
+    size are unchanged. The result is shared: callers must not mutate it."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return default
+    hit = _JSON_CACHE.get(path)
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+    data = read_json_any(path, _MISSING)
+    if data is _MISSING:
+        return default
+    _JSON_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
 def read_json_list(path: str) -> List[Dict[str, Any]]:
     return _as_list(read_json_any(path, default=[]))
 
+def read_json_list_cached(path: str) -> List[Dict[str, Any]]:
+    """read_json_list over read_json_cached: shared, do not mutate."""
+    return _as_list(read_json_cached(path, default=[]))
+
+_DIR_CACHE: Dict[str, Tuple[int, List[str]]] = {}
+
+def list_json_files(folder: str) -> List[str]:
+    """Sorted *.json file names in folder; rescanned only when the folder's
+    mtime changes (adding, removing or renaming a file bumps it)."""
+    try:
+        st = os.stat(folder)
+    except OSError:
+        return []
+    hit = _DIR_CACHE.get(folder)
+    if hit is None or hit[0] != st.st_mtime_ns:
+        with os.scandir(folder) as it:
+            names = sorted(e.name for e in it if e.name.lower().endswith(".json") and e.is_file())
+        hit = _DIR_CACHE[folder] = (st.st_mtime_ns, names)
+    return list(hit[1])
+
 def write_json(path: str, obj: Any):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    # Write a sibling temp file and swap it in, so an interrupted save never
+    # leaves a truncated map or manifest behind
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the target's permissions instead
+        try:
+            shutil.copymode(path, tmp)
+        except OSError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    # a rewrite inside the filesystem's mtime granularity could keep the key
+    _JSON_CACHE.pop(path, None)
 
 # -------------------- Data models --------------------
-@dataclass
+# Encounter marker codes as stored in MapData.enc. Any other encounter string
+# (e.g. "bridge_qte") is code ENC_OTHER, its text kept in MapData.enc_named
+ENC_CODES = {"": 0, "safe": 1, "danger": 2}
+ENC_NAMES = ("", "safe", "danger")
+ENC_OTHER = 3
+
 class TileData:
-    walkable: bool = False  # default IMPASSABLE
-    npcs: List[Dict[str, Any]] = field(default_factory=list)
-    items: List[Dict[str, Any]] = field(default_factory=list)
-    links: List[Dict[str, Any]] = field(default_factory=list)  # max 1 enforced in UI
-    chests: List[Dict[str, Any]] = field(default_factory=list)  # list of {'rarity': str}
-    note: str = ""  # per-tile note/description
-    encounter: str = ""  # "safe" | "danger" | "" (none)
-    texture: str = ""  # filename from assets/images/map_tiles
+    """Sparse per-tile contents; walkable/encounter live in MapData's arrays."""
+    __slots__ = ("npcs", "items", "links", "chests", "note", "texture")
+    def __init__(self, npcs: Optional[List[Dict[str, Any]]] = None, items: Optional[List[Dict[str, Any]]] = None,
+                 links: Optional[List[Dict[str, Any]]] = None, chests: Optional[List[Dict[str, Any]]] = None,
+                 note: str = "", texture: str = ""):
+        self.npcs: List[Dict[str, Any]] = [] if npcs is None else npcs
+        self.items: List[Dict[str, Any]] = [] if items is None else items
+        self.links: List[Dict[str, Any]] = [] if links is None else links  # max 1 enforced in UI
+        self.chests: List[Dict[str, Any]] = [] if chests is None else chests  # list of {'rarity': str}
+        self.note = note  # per-tile note/description
+        self.texture = texture  # filename from assets/images/map_tiles
+    def __eq__(self, other):
+        if not isinstance(other, TileData):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+    def __repr__(self):
+        return "TileData(" + ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__) + ")"
+
+# Stand-in for tiles without contents; read-only
+_EMPTY_TILE = TileData()
+
+def sub_key(value: Any) -> str:
+    """Subcategory as stored on tile refs: lowercased and interned once on
+    ingest, so the canvas compares it as is (the game lowercases too)."""
+    return sys.intern(str(value or "").lower())
+
+def _tile_ref(ent: Dict[str, Any]) -> Dict[str, Any]:
+    # ##ELIANA_TILE_NORM: coerce to ID-only refs
+    eid = norm_id_6(ent.get('id') or ent.get('code') or ent.get('uid') or ent.get('name'))
+    if eid:
+        return {'subcategory': sub_key(ent.get('subcategory')), 'id': eid}
+    ref = dict(ent)
+    if 'subcategory' in ref:
+        ref['subcategory'] = sub_key(ref['subcategory'])
+    return ref
 
 @dataclass
 class MapData:
@@ -205,31 +330,82 @@ class MapData:
     width: int = GRID_W_DEFAULT
     height: int = GRID_H_DEFAULT
     tile_size: int = TILE_SIZE_DEFAULT
-    tiles: List[List[TileData]] = field(default_factory=list)
+    # Grid core as flat row-major arrays, one byte per tile at y*width + x
+    walk: bytearray = field(default_factory=bytearray)  # 1 = walkable (default IMPASSABLE)
+    enc: bytearray = field(default_factory=bytearray)   # ENC_CODES / ENC_OTHER
+    # Encounter text of ENC_OTHER tiles, keyed by (x, y); an entry may outlive
+    # its code (painting over it) so undo can bring it back
+    enc_named: Dict[Tuple[int, int], str] = field(default_factory=dict)
+    # Only tiles that hold npcs/items/links/chests/note/texture, keyed by (x, y)
+    contents: Dict[Tuple[int, int], TileData] = field(default_factory=dict)
     enemy_pool: List[Dict[str, Any]] = field(default_factory=list)
 
     @staticmethod
     def new(name: str, description: str, w: int, h: int) -> "MapData":
-        tiles = [[TileData() for _ in range(w)] for __ in range(h)]
-        return MapData(name=name, description=description, width=w, height=h, tile_size=TILE_SIZE_DEFAULT, tiles=tiles)
+        return MapData(name=name, description=description, width=w, height=h, tile_size=TILE_SIZE_DEFAULT,
+                       walk=bytearray(w * h), enc=bytearray(w * h))
+
+    def tile(self, x: int, y: int) -> TileData:
+        """Contents of (x, y) for writing; created on first use."""
+        t = self.contents.get((x, y))
+        if t is None:
+            t = self.contents[(x, y)] = TileData()
+        return t
+
+    def peek(self, x: int, y: int) -> TileData:
+        """Contents of (x, y) for reading only."""
+        return self.contents.get((x, y), _EMPTY_TILE)
+
+    def prune(self, x: int, y: int) -> None:
+        """Drop (x, y) from contents once an edit leaves it empty."""
+        t = self.contents.get((x, y))
+        if t is not None and t == _EMPTY_TILE:
+            del self.contents[(x, y)]
+
+    def encounter(self, x: int, y: int) -> str:
+        code = self.enc[y * self.width + x]
+        return self.enc_named.get((x, y), "") if code == ENC_OTHER else ENC_NAMES[code]
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "width": self.width,
-            "height": self.height,
-            "tile_size": int(self.tile_size),
-            "tiles": [[{
-                "walkable": t.walkable,
+        w = self.width
+        walk, enc = self.walk, self.enc
+        # Tiles without contents only differ by walk/encounter, so rows are
+        # filled from one shared cell per combination (the JSON is unchanged);
+        # tiles with contents then get their own cell
+        # (named encounters too: their blank is always replaced below)
+        blank = [{
+            "walkable": bool(code // 4),
+            "npcs": [],
+            "items": [],
+            "links": [],
+            "chests": [],
+            "note": "",
+            "encounter": ENC_NAMES[code % 4] if code % 4 != ENC_OTHER else "",
+            "texture": "",
+        } for code in range(8)]
+        tiles = [[blank[walk[i] * 4 + enc[i]] for i in range(y * w, y * w + w)]
+                 for y in range(self.height)]
+        own = set(self.contents)
+        own.update(k for k in self.enc_named if enc[k[1] * w + k[0]] == ENC_OTHER)
+        for (x, y) in own:
+            t = self.contents.get((x, y), _EMPTY_TILE)
+            tiles[y][x] = {
+                "walkable": bool(walk[y * w + x]),
                 "npcs": t.npcs,
                 "items": t.items,
                 "links": t.links,
                 "chests": t.chests,
                 "note": t.note,
-                "encounter": t.encounter,
+                "encounter": self.encounter(x, y),
                 "texture": t.texture,
-            } for t in row] for row in self.tiles],
+            }
+        return {
+            "name": self.name,
+            "description": self.description,
+            "width": self.width,
+            "height": self.height,
+            "tile_size": int(self.tile_size),
+            "tiles": tiles,
             "enemy_pool": [copy.deepcopy(e) for e in (self.enemy_pool or []) if isinstance(e, dict)],
         }
 
@@ -241,63 +417,147 @@ class MapData:
         h = int(obj.get("height", GRID_H_DEFAULT))
         ts = int(obj.get("tile_size", TILE_SIZE_DEFAULT))
         raw_tiles = obj.get("tiles") or []
-        tiles: List[List[TileData]] = []
+        walk = bytearray(w * h)
+        enc = bytearray(w * h)
+        enc_named: Dict[Tuple[int, int], str] = {}
+        contents: Dict[Tuple[int, int], TileData] = {}
         for y in range(h):
-            row: List[TileData] = []
             for x in range(w):
                 cell = (raw_tiles[y][x] if y < len(raw_tiles) and x < len(raw_tiles[y]) else {}) or {}
-                # ##ELIANA_TILE_NORM: coerce to ID-only refs
-                _npcs = []
-                for ent in list(cell.get('npcs', [])):
-                    if isinstance(ent, dict):
-                        eid = norm_id_6(ent.get('id') or ent.get('code') or ent.get('uid') or ent.get('name'))
-                        _npcs.append({'subcategory': ent.get('subcategory') or '', 'id': eid} if eid else dict(ent))
-                _items = []
-                for ent in list(cell.get('items', [])):
-                    if isinstance(ent, dict):
-                        eid = norm_id_6(ent.get('id') or ent.get('code') or ent.get('uid') or ent.get('name'))
-                        _items.append({'subcategory': ent.get('subcategory') or '', 'id': eid} if eid else dict(ent))
-                row.append(TileData(
-                    walkable=bool(cell.get('walkable', False)),
-                    npcs=_npcs,
-                    items=_items,
-                    links=list(cell.get('links', [])),
-                    chests=list(cell.get('chests', [])),
-                    note=str(cell.get('note', '')),
-                    encounter=str(cell.get('encounter', '')),
-                    texture=str(cell.get('texture', '')),
-                ))
-            tiles.append(row)
+                walk[y * w + x] = 1 if cell.get('walkable', False) else 0
+                encounter = str(cell.get('encounter', ''))
+                code = ENC_CODES.get(encounter)
+                if code is None:
+                    code = ENC_OTHER
+                    enc_named[(x, y)] = encounter
+                enc[y * w + x] = code
+                _npcs = [_tile_ref(ent) for ent in cell.get('npcs', []) if isinstance(ent, dict)]
+                _items = [_tile_ref(ent) for ent in cell.get('items', []) if isinstance(ent, dict)]
+                # copy entries so the map never aliases a (possibly cached) source doc
+                links = [dict(e) if isinstance(e, dict) else e for e in cell.get('links', [])]
+                chests = [dict(e) if isinstance(e, dict) else e for e in cell.get('chests', [])]
+                note = str(cell.get('note', ''))
+                texture = str(cell.get('texture', ''))
+                if _npcs or _items or links or chests or note or texture:
+                    contents[(x, y)] = TileData(npcs=_npcs, items=_items, links=links, chests=chests,
+                                                note=note, texture=texture)
         raw_pool = obj.get("enemy_pool") or []
         enemy_pool: List[Dict[str, Any]] = []
         for entry in raw_pool:
             if isinstance(entry, dict):
                 enemy_pool.append(copy.deepcopy(entry))
-        return MapData(name=name, description=desc, width=w, height=h, tile_size=ts, tiles=tiles, enemy_pool=enemy_pool)
+        return MapData(name=name, description=desc, width=w, height=h, tile_size=ts,
+                       walk=walk, enc=enc, enc_named=enc_named, contents=contents, enemy_pool=enemy_pool)
+
+def flood_region(arr: bytearray, w: int, h: int, x: int, y: int) -> List[int]:
+    """Indices of the 4-connected region around (x, y) holding the same value."""
+    target = arr[y * w + x]
+    seen = bytearray(w * h)
+    stack = [y * w + x]
+    seen[stack[0]] = 1
+    out: List[int] = []
+    while stack:
+        i = stack.pop()
+        out.append(i)
+        cx = i % w
+        # left, right, up, down; row edges checked on x, grid edges on index
+        for j, ok in ((i - 1, cx > 0), (i + 1, cx < w - 1), (i - w, i >= w), (i + w, i + w < w * h)):
+            if ok and not seen[j] and arr[j] == target:
+                seen[j] = 1
+                stack.append(j)
+    return out
+
+# Marker categories, one bit each, listed in draw order
+_MARKER_ORDER = ("enemy", "villain", "ally", "citizen", "monster", "animal", "quest_item", "item", "link")
+_MARKER_BIT = {k: 1 << i for i, k in enumerate(_MARKER_ORDER)}
+_NPC_SUB_BITS = {
+    "allies": _MARKER_BIT["ally"],
+    "enemies": _MARKER_BIT["enemy"],
+    "villains": _MARKER_BIT["villain"],
+    "citizens": _MARKER_BIT["citizen"],
+    "monsters": _MARKER_BIT["monster"],
+    "animals": _MARKER_BIT["animal"],
+}
+_DOT_ORDER = tuple((_MARKER_BIT[k], TYPE_DOT_COLORS[k]) for k in _MARKER_ORDER)
+
+def tile_markers(t: TileData) -> List[Tuple[str, Tuple[int, int, int]]]:
+    """Canvas markers for a tile as (shape, color), in draw order."""
+    # collect dot categories
+    has = 0
+    for e in t.npcs:
+        has |= _NPC_SUB_BITS.get(e.get("subcategory") or "", 0)
+    for it in (t.items or []):
+        # Any non-quest item or non-dict entry counts as a generic item
+        if isinstance(it, dict) and it.get("subcategory") == "quest_items":
+            has |= _MARKER_BIT["quest_item"]
+        else:
+            has |= _MARKER_BIT["item"]
+    if t.links:
+        has |= _MARKER_BIT["link"]
+    # Build marker list with shapes so chest can integrate into grid
+    markers: List[Tuple[str, Tuple[int,int,int]]] = [("circle", col) for bit, col in _DOT_ORDER if has & bit]
+    # Include one square marker if any chest present on tile
+    if t.chests:
+        markers.append(("square", COL_WHITE))
+    return markers
 
 # -------------------- History (Undo/Redo) --------------------
+# One tile-array write: (array, index, old, new), array being MapData.walk/enc
+CellEdit = Tuple[bytearray, int, int, int]
+
 class History:
-    def __init__(self, limit: int = 200):
+    def __init__(self, limit: int = 200, on_cells: Optional[Callable[[List[CellEdit]], None]] = None):
         self.limit = limit
-        self.stack: List[Tuple[Callable[[], None], Callable[[], None], str]] = []
-        self.index = -1  # last applied index
+        # Applied entries, oldest dropped in O(1) past the limit; undone
+        # entries wait on redo_stack until the next push clears it
+        self.stack: Deque[Tuple[Callable[[], None], Callable[[], None], str]] = deque(maxlen=limit)
+        self.redo_stack: List[Tuple[Callable[[], None], Callable[[], None], str]] = []
         self.batch: List[Tuple[Callable[[], None], Callable[[], None]]] = []
+        # Tile-array writes are kept as plain records, not closure pairs, so a
+        # brush stroke over N tiles costs N tuples
+        self.batch_cells: List[CellEdit] = []
         self.in_batch = False
         self.batch_label = ""
+        self.on_cells = on_cells  # told which records were just applied
+        # Bumped whenever an entry is applied, undone or redone, so views can
+        # cache what they derive from the map
+        self.version = 0
+    def _apply_cells(self, edits: List[CellEdit], forward: bool):
+        if forward:
+            for arr, i, _old, new in edits:
+                arr[i] = new
+        else:
+            for arr, i, old, _new in reversed(edits):
+                arr[i] = old
+        if self.on_cells is not None:
+            self.on_cells(edits)
+    def record_cell(self, arr: bytearray, i: int, old: int, new: int, label: str = "", *, batch: bool = False):
+        if batch and self.in_batch:
+            # Written straight away so a stroke shows (and re-checks the
+            # tile) while dragging; end_batch records it as one undo step
+            edit = (arr, i, old, new)
+            self.batch_cells.append(edit)
+            self._apply_cells([edit], True)
+        else:
+            self.push_cells([(arr, i, old, new)], label)
+    def push_cells(self, edits: List[CellEdit], label: str = ""):
+        """Apply many tile-array writes as one undo step."""
+        self.push(functools.partial(self._apply_cells, edits, True),
+                  functools.partial(self._apply_cells, edits, False), label)
     def push(self, do_fn: Callable[[], None], undo_fn: Callable[[], None], label: str = ""):
-        if self.index < len(self.stack) - 1:
-            self.stack = self.stack[:self.index+1]
-        self.stack.append((do_fn, undo_fn, label))
-        if len(self.stack) > self.limit:
-            self.stack = self.stack[-self.limit:]
-            self.index = len(self.stack) - 1
+        self._record(do_fn, undo_fn, label)
         do_fn()
-        self.index += 1
+    def _record(self, do_fn: Callable[[], None], undo_fn: Callable[[], None], label: str):
+        if self.redo_stack:
+            self.redo_stack.clear()
+        self.stack.append((do_fn, undo_fn, label))
+        self.version += 1
     def begin_batch(self, label: str):
         if self.in_batch: return
         self.in_batch = True
         self.batch_label = label
         self.batch.clear()
+        self.batch_cells = []
     def add_to_batch(self, do_fn: Callable[[], None], undo_fn: Callable[[], None]):
         if not self.in_batch:
             self.push(do_fn, undo_fn, "single")
@@ -306,41 +566,112 @@ class History:
     def end_batch(self):
         if not self.in_batch:
             return
-        if not self.batch:
+        if not self.batch and not self.batch_cells:
             self.in_batch = False; self.batch_label = ""; return
+        # Snapshot both lists: the closures below outlive this batch
+        ops = list(self.batch)
+        cells = self.batch_cells
         def do_all():
-            for d,u in self.batch:
+            if cells:
+                self._apply_cells(cells, True)
+            for d,u in ops:
                 d()
         def undo_all():
-            for d,u in reversed(self.batch):
+            for d,u in reversed(ops):
                 u()
-        self.push(do_all, undo_all, self.batch_label)
+            if cells:
+                self._apply_cells(cells, False)
         self.in_batch = False
+        # Cells are already written; only the closure ops still need to run
+        self._record(do_all, undo_all, self.batch_label)
+        for d,u in ops:
+            d()
         self.batch_label = ""
         self.batch.clear()
+        self.batch_cells = []
     def can_undo(self) -> bool:
-        return self.index >= 0
+        return bool(self.stack)
     def can_redo(self) -> bool:
-        return self.index < len(self.stack) - 1
+        return bool(self.redo_stack)
     def undo(self):
         if not self.can_undo(): return
-        _, undo_fn, _ = self.stack[self.index]
-        undo_fn()
-        self.index -= 1
+        entry = self.stack.pop()
+        entry[1]()
+        self.redo_stack.append(entry)
+        self.version += 1
     def redo(self):
         if not self.can_redo(): return
-        do_fn, _, _ = self.stack[self.index+1]
-        do_fn()
-        self.index += 1
+        entry = self.redo_stack.pop()
+        entry[0]()
+        self.stack.append(entry)
+        self.version += 1
 
 # -------------------- Pygame UI --------------------
 pygame.init()
 pygame.display.set_caption("RPGenesis - Map Editor (Pygame)")
 FONT = pygame.font.SysFont("segoeui", 16)
 FONT_BOLD = pygame.font.SysFont("segoeui", 18, bold=True)
+FONT_H = FONT.get_height()
+
+@functools.lru_cache(maxsize=8192)
+def _text_w(text: str) -> int:
+    # FONT.size() is a call into the font renderer; widths of repeated
+    # words/prefixes (wrapping, tooltips) come from here instead
+    return FONT.size(text)[0]
+
+@functools.lru_cache(maxsize=4096)
+def _render_text(text: str, color: Tuple[int, ...], font) -> "pygame.Surface":
+    # Labels repeat every frame; rasterize each (text, color, font) once.
+    # The surface is shared: blit it, never draw on it.
+    return font.render(text, True, color)
+
+@functools.lru_cache(maxsize=256)
+def _panel_surface(w: int, h: int, fill: Tuple[int, ...], border: Optional[Tuple[int, ...]], radius: int) -> "pygame.Surface":
+    # Rounded fill (+ 1px border) rasterized once per size/colors, then blitted
+    panel = pygame.Surface((max(1, w), max(1, h)), pygame.SRCALPHA)
+    rect = panel.get_rect()
+    pygame.draw.rect(panel, fill, rect, border_radius=radius)
+    if border is not None:
+        pygame.draw.rect(panel, border, rect, 1, border_radius=radius)
+    return panel
+
+def draw_panel(surface, rect, fill, border=GRID_LINE, radius=8):
+    r = pygame.Rect(rect)
+    surface.blit(_panel_surface(r.w, r.h, tuple(fill), None if border is None else tuple(border), radius), r.topleft)
+
+@functools.lru_cache(maxsize=256)
+def _marker_sprite(shape: str, color: Tuple[int, ...], radius: int) -> "pygame.Surface":
+    # Tile marker (outlined dot, or chest square) rasterized once per
+    # shape/color/radius; centred at (radius, radius)
+    size = 2 * radius + 1
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    if shape == "square":
+        side = max(4, 2 * radius - 2)
+        r = pygame.Rect(radius - side // 2, radius - side // 2, side, side)
+        sprite.fill(color, r)
+        pygame.draw.rect(sprite, (10,10,12), r, 1)
+    else:
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        pygame.draw.circle(sprite, (10,10,12), (radius, radius), radius, 1)
+    return sprite
+
+@functools.lru_cache(maxsize=64)
+def _tooltip_surface(lines: Tuple[str, ...]) -> "pygame.Surface":
+    # Whole tooltip (panel + text) built once per distinct set of lines
+    pad = 8
+    w = max(_text_w(s) for s in lines) + pad*2
+    h = FONT_H * len(lines) + pad*2 + (len(lines)-1)*2
+    tip = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(tip, TOOLTIP_BG_RGBA, tip.get_rect(), border_radius=8)
+    pygame.draw.rect(tip, TOOLTIP_BORDER, tip.get_rect(), 1, border_radius=8)
+    yy = pad
+    for s in lines:
+        tip.blit(_render_text(s, TOOLTIP_TEXT, FONT), (pad, yy))
+        yy += FONT_H + 2
+    return tip
 
 def draw_text(surface, text, pos, color=TEXT_MAIN, font=FONT):
-    surface.blit(font.render(text, True, color), pos)
+    surface.blit(_render_text(text, tuple(color), font), pos)
 
 # ---------- Mouse position provider (to support window scaling) ----------
 _mouse_pos_provider = None  # type: Optional[Callable[[], Tuple[int,int]]]
@@ -358,6 +689,13 @@ def get_mouse_pos() -> Tuple[int,int]:
     return pygame.mouse.get_pos()
 
 # ---------- UI widgets ----------
+def _row_at(y: int, top: int, step: int, n: int) -> int:
+    """Index of the fixed-pitch row (pitch step, first at top) under y, or -1."""
+    if y < top or step <= 0:
+        return -1
+    i = (y - top) // step
+    return i if i < n else -1
+
 class Button:
     def __init__(self, rect, text, on_click: Callable[[], None], *, danger=False):
         self.rect = pygame.Rect(rect)
@@ -379,9 +717,8 @@ class Button:
             base = BTN_ACTIVE
         else:
             base = BTN_BG
-        pygame.draw.rect(surf, BTN_HOVER if self.hover and not self.selected else base, self.rect, border_radius=8)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=8)
-        txt = FONT.render(self.text, True, TEXT_MAIN)
+        draw_panel(surf, self.rect, BTN_HOVER if self.hover and not self.selected else base, GRID_LINE, 8)
+        txt = _render_text(self.text, TEXT_MAIN, FONT)
         surf.blit(txt, txt.get_rect(center=self.rect.center))
 
 class TextInput:
@@ -408,8 +745,7 @@ class TextInput:
             self.cursor_timer = 0
             self.cursor_show = not self.cursor_show
     def draw(self, surf):
-        pygame.draw.rect(surf, INPUT_BG, self.rect, border_radius=6)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=6)
+        draw_panel(surf, self.rect, INPUT_BG, GRID_LINE, 6)
         txt = FONT.render(self.text, True, TEXT_MAIN)
         surf.blit(txt, (self.rect.x+8, self.rect.y+6))
         if self.active and self.cursor_show:
@@ -426,6 +762,8 @@ class TextArea:
         self.cursor_timer = 0
         self.cursor_show = True
         self.line_spacing = 4
+        self._wrap_key: Optional[Tuple[str, int]] = None
+        self._wrap_lines: List[str] = []
     def handle(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             self.active = self.rect.collidepoint(event.pos)
@@ -453,7 +791,7 @@ class TextArea:
         line = ""
         for w in words:
             test = (line + " " + w).strip()
-            if FONT.size(test)[0] <= width_px or not line:
+            if _text_w(test) <= width_px or not line:
                 line = test
             else:
                 lines.append(line)
@@ -461,26 +799,36 @@ class TextArea:
         lines.append(line)
         out = []
         for raw in "\n".join(lines).split("\n"):
-            cur = ""
-            for ch in raw:
-                if FONT.size(cur + ch)[0] <= width_px or not cur:
-                    cur += ch
-                else:
-                    out.append(cur)
-                    cur = ch
-            out.append(cur)
+            # Hard-break long lines at the longest prefix that fits (at least
+            # one char), found by binary search over prefix widths
+            start, n = 0, len(raw)
+            while n - start > 1 and _text_w(raw[start:]) > width_px:
+                lo, hi = start + 1, n
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if _text_w(raw[start:mid]) <= width_px:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                out.append(raw[start:lo])
+                start = lo
+            out.append(raw[start:])
         return out
     def draw(self, surf):
-        pygame.draw.rect(surf, INPUT_BG, self.rect, border_radius=6)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=6)
+        draw_panel(surf, self.rect, INPUT_BG, GRID_LINE, 6)
         clip = surf.get_clip()
         surf.set_clip(self.rect)
         inner_w = self.rect.w - 12
-        lines = self._wrap(self.text, inner_w)
+        # Only re-wrap when the text or width changed since the last frame
+        key = (self.text, inner_w)
+        if key != self._wrap_key:
+            self._wrap_key = key
+            self._wrap_lines = self._wrap(self.text, inner_w)
+        lines = self._wrap_lines
         y = self.rect.y + 6 - self.scroll
         for ln in lines:
-            surf.blit(FONT.render(ln, True, TEXT_MAIN), (self.rect.x+6, y))
-            y += FONT.get_height() + self.line_spacing
+            surf.blit(_render_text(ln, TEXT_MAIN, FONT), (self.rect.x+6, y))
+            y += FONT_H + self.line_spacing
         surf.set_clip(clip)
 
 class Dropdown:
@@ -499,6 +847,8 @@ class Dropdown:
         self._popup_area: Optional[pygame.Rect] = None
         self._popup_has_scroll: bool = False
         self._scrollbar_w: int = 8
+        # Inputs the popup layout was last built from (None: no layout)
+        self._popup_key: Optional[Tuple[Any, ...]] = None
         # Optional callable: (opt: str, size_px: int) -> pygame.Surface | None
         self.get_icon = get_icon
     def is_open(self):
@@ -514,12 +864,15 @@ class Dropdown:
                     self.scroll_index = 0
                 self.opened = not self.opened
             elif self.opened:
-                for idx, r in zip(self.popup_indices, self.popup_rects):
-                    if r.collidepoint(event.pos):
-                        self.value = self.options[idx]
+                # Popup rows are stacked at the base's height: index by offset
+                area = self._popup_area
+                if area and self.popup_rects and area.collidepoint(event.pos) \
+                        and event.pos[0] < self.popup_rects[0].right:
+                    row = _row_at(event.pos[1], area.top, self.rect.h, len(self.popup_indices))
+                    if row >= 0:
+                        self.value = self.options[self.popup_indices[row]]
                         if self.on_change:
                             self.on_change(self.value)
-                        break
                 self.opened = False
         elif event.type == pygame.MOUSEWHEEL and self.opened:
             try:
@@ -533,8 +886,7 @@ class Dropdown:
                     max_start = max(0, len(self.options) - max(1, self.max_visible))
                     self.scroll_index = min(max_start, self.scroll_index + 1)
     def draw_base(self, surf):
-        pygame.draw.rect(surf, BTN_HOVER if self.hover else BTN_BG, self.rect, border_radius=6)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=6)
+        draw_panel(surf, self.rect, BTN_HOVER if self.hover else BTN_BG, GRID_LINE, 6)
         x_text = self.rect.x + 8
         # Small icon inside base (if available)
         if self.get_icon and self.value:
@@ -548,11 +900,23 @@ class Dropdown:
             except Exception:
                 pass
         draw_text(surf, self.value, (x_text, self.rect.y+6))
+        if not self.opened:
+            if self._popup_key is not None:
+                self._popup_key = None
+                self.popup_rects.clear()
+                self.popup_indices.clear()
+                self._popup_area = None
+                self._popup_has_scroll = False
+            return
+        # The layout only depends on these; rebuild when one of them changes
+        key = (surf.get_height(), tuple(self.rect), len(self.options), self.max_visible, self.scroll_index)
+        if key == self._popup_key:
+            return
+        self._popup_key = key
         self.popup_rects.clear()
         self.popup_indices.clear()
         self._popup_area = None
         self._popup_has_scroll = False
-        if not self.opened: return
 # fmt: off
         screen_h = surf.get_height()
         needed_h = self.rect.h * len(self.options)
@@ -606,7 +970,7 @@ class Dropdown:
             mx, my = pygame.mouse.get_pos()
         for r, idx in zip(self.popup_rects, self.popup_indices):
             hovered = r.collidepoint((mx, my))
-            pygame.draw.rect(surf, BTN_HOVER if hovered else PANEL_BG, r)
+            surf.fill(BTN_HOVER if hovered else PANEL_BG, r)
             pygame.draw.rect(surf, GRID_LINE, r, 1)
             x = r.x + 8
             if self.get_icon:
@@ -624,7 +988,7 @@ class Dropdown:
         if self._popup_has_scroll and self._popup_area:
             area = self._popup_area
             bar_rect = pygame.Rect(area.right - self._scrollbar_w + 1, area.top, self._scrollbar_w - 2, area.height)
-            pygame.draw.rect(surf, PANEL_BG, bar_rect)
+            surf.fill(PANEL_BG, bar_rect)
             pygame.draw.rect(surf, GRID_LINE, bar_rect.inflate(2, 0), 1)
             track_height = max(4, bar_rect.height - 4)
             total = max(1, len(self.options))
@@ -633,8 +997,8 @@ class Dropdown:
             max_start = max(1, total - visible)
             offset = 0 if max_start == 0 else int((track_height - thumb_height) * (self.scroll_index / max_start))
             thumb = pygame.Rect(bar_rect.x, bar_rect.y + 2 + offset, bar_rect.width, thumb_height)
-            pygame.draw.rect(surf, BTN_BG, bar_rect)
-            pygame.draw.rect(surf, ACCENT, thumb, border_radius=2)
+            surf.fill(BTN_BG, bar_rect)
+            draw_panel(surf, thumb, ACCENT, None, 2)
 
 class ScrollListWithButtons:
     """Scrollable list that renders labels with Remove buttons; provides wheel scrolling.
@@ -665,10 +1029,10 @@ class ScrollListWithButtons:
         if not self.rect.collidepoint((x,y)):
             return None
         y_start = self.rect.y - self.scroll
-        for i in range(len(self.items)):
+        i = _row_at(y, y_start, self.item_h + self.spacing, len(self.items))
+        if i >= 0:
             row_y = y_start + i * (self.item_h + self.spacing)
-            row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
-            if row_rect.collidepoint((x, y)):
+            if pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h).collidepoint((x, y)):
                 return i
         return None
     def handle(self, event):
@@ -680,16 +1044,15 @@ class ScrollListWithButtons:
             if not self.rect.collidepoint((x, y)):
                 return
             y_start = self.rect.y - self.scroll
-            for i, (label, on_remove, _color) in enumerate(self.items):
+            i = _row_at(y, y_start, self.item_h + self.spacing, len(self.items))
+            if i >= 0:
                 row_y = y_start + i * (self.item_h + self.spacing)
-                row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
-                btn_rect = pygame.Rect(row_rect.right-70, row_rect.y, 64, self.item_h)
+                row_right = self.rect.x + 6 + self.rect.w - 12
+                btn_rect = pygame.Rect(row_right-70, row_y, 64, self.item_h)
                 if btn_rect.collidepoint((x, y)):
-                    on_remove()
-                    break
+                    self.items[i][1]()
     def draw(self, surf):
-        pygame.draw.rect(surf, PANEL_BG_DARK, self.rect, border_radius=8)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=8)
+        draw_panel(surf, self.rect, PANEL_BG_DARK, GRID_LINE, 8)
         clip = surf.get_clip()
         surf.set_clip(self.rect)
         y_start = self.rect.y - self.scroll
@@ -701,10 +1064,10 @@ class ScrollListWithButtons:
             row_y = y_start + i * (self.item_h + self.spacing)
             row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
             hovered = row_rect.collidepoint((mx, my))
-            pygame.draw.rect(surf, BTN_HOVER if hovered else PANEL_BG, row_rect, border_radius=6)
+            draw_panel(surf, row_rect, BTN_HOVER if hovered else PANEL_BG, None, 6)
             draw_text(surf, label[:60], (row_rect.x+8, row_rect.y+4), color=color or TEXT_MAIN)
             btn_rect = pygame.Rect(row_rect.right-70, row_rect.y, 64, self.item_h)
-            pygame.draw.rect(surf, DANGER, btn_rect, border_radius=6)
+            draw_panel(surf, btn_rect, DANGER, None, 6)
             draw_text(surf, "Remove", (btn_rect.x+6, btn_rect.y+4))
         surf.set_clip(clip)
 
@@ -738,16 +1101,12 @@ class StartScreen:
         def _scan_maps_dir() -> List[Dict[str, Any]]:
             out: List[Dict[str, Any]] = []
             try:
-                if not os.path.isdir(MAP_DIR):
-                    return out
-                for fn in sorted(os.listdir(MAP_DIR)):
-                    if not fn.lower().endswith('.json'):
-                        continue
+                for fn in list_json_files(MAP_DIR):
                     if fn.lower() == 'world_map.json':
                         # Do not include the world map in the selectable list
                         continue
                     path = os.path.join(MAP_DIR, fn)
-                    doc = read_json_any(path, None)
+                    doc = read_json_cached(path, None)
                     if not isinstance(doc, dict):
                         continue
                     # Heuristic to detect a map document
@@ -770,7 +1129,7 @@ class StartScreen:
             return out
 
         # Prefer manifest when available, but fall back to directory scan
-        manifest = read_json_any(MANIFEST, {"maps": []})
+        manifest = read_json_cached(MANIFEST, {"maps": []})
         maps = manifest.get("maps") if isinstance(manifest, dict) else []
         if not isinstance(maps, list) or not maps:
             maps = _scan_maps_dir()
@@ -790,8 +1149,7 @@ class StartScreen:
         self.btn_refresh.draw(surf); self.btn_open.draw(surf)
         self.maps_list.draw(surf)
         panel_rect = pygame.Rect(left, 400, self.maps_list.rect.w, 70)
-        pygame.draw.rect(surf, PANEL_BG, panel_rect, border_radius=8)
-        pygame.draw.rect(surf, GRID_LINE, panel_rect, 1, border_radius=8)
+        draw_panel(surf, panel_rect, PANEL_BG, GRID_LINE, 8)
         self.btn_create.draw(surf)
         self.btn_world.draw(surf)
     def handle(self, event):
@@ -810,7 +1168,7 @@ class StartScreen:
         file_name = entry.get("file")
         if not file_name: return
         path = os.path.join(MAP_DIR, file_name)
-        obj = read_json_any(path, None)
+        obj = read_json_cached(path, None)
         if obj is None: return
         self.app.goto_editor(MapData.from_dict(obj))
     def create_map(self):
@@ -835,8 +1193,14 @@ class EditorScreen:
         # Default to top-down (face-down) view; no isometric projection
         self.view_iso: bool = False
 
-        # History
-        self.history = History()
+        # History; tile-array edits mark their tiles dirty for the background
+        self._dirty_cells: set = set()
+        self.history = History(on_cells=self._mark_cells_dirty)
+        # Per-tile marker lists for the canvas, valid for one history version
+        self._marker_cache: Dict[Tuple[int, int], List[Tuple[str, Tuple[int, int, int]]]] = {}
+        self._marker_version = -1
+        # (selection, size, history version) the inspector rows were built for
+        self._scroll_key: Optional[Tuple[Any, ...]] = None
         self.painting_batch_active = False
         self.painting_button = None  # 1=left (Impassable), 3=right (Passable))
 
@@ -893,7 +1257,7 @@ class EditorScreen:
         self._rebuild_enemy_pool_list()
 
         # Links (no arming; add directly to selected tile) — enforce max 1
-        self.maps_available = [f for f in os.listdir(MAP_DIR) if f.lower().endswith(".json")]
+        self.maps_available = list_json_files(MAP_DIR)
         link_default = self.maps_available[0] if self.maps_available else ""
         self.dd_link_map = Dropdown((920, 215, 220, 26), self.maps_available, value=link_default, on_change=None)
         self.link_entry_inp = TextInput((1150, 215, 110, 26), "")
@@ -947,6 +1311,12 @@ class EditorScreen:
         self.note_btn_save   = Button((340, 490, 100, 30), "Save", self.save_note_modal)
         self.note_btn_cancel = Button((460, 490, 100, 30), "Cancel", self.close_note_modal)
 
+        # Top view background: one pixel per tile, scaled to the visible tiles
+        self._bg_src: Optional[Tuple[bytearray, bytearray]] = None
+        self._bg_small: Optional[pygame.Surface] = None
+        self._bg_scaled: Optional[pygame.Surface] = None
+        self._bg_scaled_key: Optional[Tuple[int, int, int, int, int]] = None
+
         # canvas state
         self.panning = False
         self.pan_start = (0,0)
@@ -995,7 +1365,7 @@ class EditorScreen:
 
         name_input_height = self.name_inp.rect.height
         label_name_x = 14
-        label_name_y = top_y + max(0, (name_input_height - FONT.get_height()) // 2)
+        label_name_y = top_y + max(0, (name_input_height - FONT_H) // 2)
         self._label_name_pos = (label_name_x, label_name_y)
 
         button_sequence = (self.btn_save, self.btn_back, self.btn_undo, self.btn_redo)
@@ -1021,7 +1391,7 @@ class EditorScreen:
         label_size_x = max(self.btn_redo.rect.right + btn_spacing, mode_left_edge - total_size_controls)
         if label_size_x < self.btn_redo.rect.right + btn_spacing:
             label_size_x = self.btn_redo.rect.right + btn_spacing
-        label_size_y = top_y + max(0, (self.resize_w_inp.rect.height - FONT.get_height()) // 2)
+        label_size_y = top_y + max(0, (self.resize_w_inp.rect.height - FONT_H) // 2)
         self._label_size_pos = (label_size_x, label_size_y)
 
         self.resize_w_inp.rect.topleft = (label_size_x + label_size_w + 8, top_y)
@@ -1287,6 +1657,11 @@ class EditorScreen:
             self.dd_npc_sub.is_open() or self.dd_item_sub.is_open() or self.dd_link_map.is_open() or self.dd_chest_rarity.is_open()
         )
 
+    def _text_focused(self) -> bool:
+        """True while a text field has keyboard focus (keys are typing)."""
+        fields = (self.name_inp, self.resize_w_inp, self.resize_h_inp, self.link_entry_inp, self.desc_area)
+        return any(f.active for f in fields)
+
     def cycle_left_mode(self):
         modes = ["select", "paint", "safety"]
         idx = modes.index(self.left_click_mode)
@@ -1300,12 +1675,11 @@ class EditorScreen:
 
     def _switch_category(self, label: str):
         self.category = label
+        # the reloads fill list_box themselves for the active category
         if label == "NPCs":
             self._reload_npcs()
-            self.list_box.set_items([self._display_label(e) for e in self.npc_entries])
         elif label == "Items":
             self._reload_items()
-            self.list_box.set_items([self._display_label(e) for e in self.item_entries])
         elif label == "Chests":
             self.list_box.set_items([])
         elif label == "Links":
@@ -1318,7 +1692,7 @@ class EditorScreen:
 
     def _reload_npcs(self):
         sub = self.dd_npc_sub.value
-        entries = read_json_list(os.path.join(NPC_DIR, f"{sub}.json"))
+        entries = read_json_list_cached(os.path.join(NPC_DIR, f"{sub}.json"))
         self.npc_entries = entries
         # Refresh global catalog (in case files changed)
         self._npc_by_id = build_npc_catalog_by_id()
@@ -1327,7 +1701,7 @@ class EditorScreen:
 
     def _reload_items(self):
         sub = self.dd_item_sub.value
-        entries = read_json_list(os.path.join(ITEM_DIR, f"{sub}.json"))
+        entries = read_json_list_cached(os.path.join(ITEM_DIR, f"{sub}.json"))
         self.item_entries = entries
         # Refresh global catalog (in case files changed)
         self._item_by_id = build_item_catalog_by_id()
@@ -1348,7 +1722,7 @@ class EditorScreen:
 
     def _load_enemy_catalog(self) -> List[Dict[str, Any]]:
         path = os.path.join(NPC_DIR, "enemies.json")
-        entries = read_json_list(path)
+        entries = read_json_list_cached(path)
         return [copy.deepcopy(e) for e in entries if isinstance(e, dict)]
 
     def _refresh_enemy_catalog_box(self):
@@ -1370,8 +1744,7 @@ class EditorScreen:
         if rect.height <= 0 or rect.width <= 0:
             return
 
-        pygame.draw.rect(surf, PANEL_BG_DARK, rect, border_radius=8)
-        pygame.draw.rect(surf, GRID_LINE, rect, 1, border_radius=8)
+        draw_panel(surf, rect, PANEL_BG_DARK, GRID_LINE, 8)
 
         clip = surf.get_clip()
         content_rect = rect.inflate(-6, -6)
@@ -1450,48 +1823,72 @@ class EditorScreen:
         self.history.push(do, undo, "clear_enemy_pool")
 
     # ---------- history helpers ----------
+    def _mark_cells_dirty(self, edits: List[CellEdit]):
+        # Records always target the live arrays when applied, so the current
+        # width maps their indices back to tiles
+        w = self.map.width
+        self._dirty_cells.update((i % w, i // w) for _arr, i, _old, _new in edits)
+
     def _record_tile_walkable(self, x:int, y:int, new_val: bool, *, batch=False, label="paint"):
-        t = self.map.tiles[y][x]
-        old = t.walkable
-        if old == new_val:
+        walk = self.map.walk
+        i = y * self.map.width + x
+        old = walk[i]
+        new = 1 if new_val else 0
+        if old == new:
             return
-        def do():  t.walkable = new_val
-        def undo(): t.walkable = old
-        if batch:
-            self.history.add_to_batch(do, undo)
-        else:
-            self.history.push(do, undo, label)
+        self.history.record_cell(walk, i, old, new, label, batch=batch)
 
     
     def _record_set_encounter(self, x:int, y:int, state: str, *, batch=False, label="enc"):
-        t = self.map.tiles[y][x]
-        old = t.encounter
-        new = state
+        enc = self.map.enc
+        i = y * self.map.width + x
+        old = enc[i]
+        new = ENC_CODES.get(state, 0)
         if old == new:
             return
-        def do():  setattr(t, "encounter", new)
-        def undo(): setattr(t, "encounter", old)
-        if batch:
-            self.history.add_to_batch(do, undo)
-        else:
-            self.history.push(do, undo, label)
+        self.history.record_cell(enc, i, old, new, label, batch=batch)
+
+    def flood_walkable(self, x: int, y: int):
+        """Flip the walkable flag of the whole connected region around (x, y)."""
+        m = self.map
+        if not (0 <= x < m.width and 0 <= y < m.height):
+            return
+        walk = m.walk
+        old = walk[y * m.width + x]
+        new = 0 if old else 1
+        edits = [(walk, i, old, new) for i in flood_region(walk, m.width, m.height, x, y)]
+        self.history.push_cells(edits, "flood_fill")
 
     # texture editing removed in simplified view
 
-    def _record_add_list_entry(self, lst: List[Dict[str,Any]], entry: Dict[str,Any], label="add"):
-        def do():  lst.append(entry)
+    # Tile list edits look the tile up on every do/undo (rather than holding
+    # its TileData), so a tile pruned from contents is recreated on redo
+    def _record_add_list_entry(self, x: int, y: int, key: str, entry: Dict[str,Any], label="add"):
+        m = self.map
+        def do():  getattr(m.tile(x, y), key).append(entry)
         def undo():
-            for i in range(len(lst)-1, -1, -1):
-                if lst[i] is entry:
-                    lst.pop(i); break
+            lst = getattr(m.peek(x, y), key)
+            # do() appended, and history unwinds in order, so the entry is
+            # normally still last; scan back only if the list was edited aside
+            if lst and lst[-1] is entry:
+                lst.pop()
+            else:
+                for i in range(len(lst)-1, -1, -1):
+                    if lst[i] is entry:
+                        lst.pop(i); break
+            m.prune(x, y)
         self.history.push(do, undo, label)
 
-    def _record_remove_list_entry(self, lst: List[Dict[str,Any]], index: int, label="remove"):
+    def _record_remove_list_entry(self, x: int, y: int, key: str, index: int, label="remove"):
+        m = self.map
+        lst = getattr(m.peek(x, y), key)
         if not (0 <= index < len(lst)):
             return
         entry = lst[index]
-        def do():  lst.pop(index)
-        def undo(): lst.insert(index, entry)
+        def do():
+            getattr(m.tile(x, y), key).pop(index)
+            m.prune(x, y)
+        def undo(): getattr(m.tile(x, y), key).insert(index, entry)
         self.history.push(do, undo, label)
 
     # ---------- adders ----------
@@ -1499,25 +1896,24 @@ class EditorScreen:
         if not self.selected: return
         x,y = self.selected
         if not (0 <= x < self.map.width and 0 <= y < self.map.height): return
-        t = self.map.tiles[y][x]
         if self.category == "NPCs":
             idx = self.list_box.selected
             if idx < 0 or idx >= len(self.npc_entries): return
             e = self.npc_entries[idx]
             entry = {
-                "subcategory": self.dd_npc_sub.value,
+                "subcategory": sub_key(self.dd_npc_sub.value),
                 "id": norm_id_6(e.get('id') or e.get('code') or e.get('uid') or e.get('name')),
             }
-            self._record_add_list_entry(t.npcs, entry, "add_npc")
+            self._record_add_list_entry(x, y, "npcs", entry, "add_npc")
         elif self.category == "Items":
             idx = self.list_box.selected
             if idx < 0 or idx >= len(self.item_entries): return
             e = self.item_entries[idx]
             entry = {
-                "subcategory": self.dd_item_sub.value,
+                "subcategory": sub_key(self.dd_item_sub.value),
                 "id": norm_id_6(e.get('id') or e.get('code') or e.get('uid') or e.get('name')),
             }
-            self._record_add_list_entry(t.items, entry, "add_item")
+            self._record_add_list_entry(x, y, "items", entry, "add_item")
 
     def add_chest_to_selected(self):
         # Ensure we have a target tile: prefer selected; else try hovered
@@ -1530,10 +1926,9 @@ class EditorScreen:
         x, y = self.selected
         if not (0 <= x < self.map.width and 0 <= y < self.map.height):
             return
-        t = self.map.tiles[y][x]
         rarity = str(self.dd_chest_rarity.value or 'common').lower()
         entry = {"rarity": rarity}
-        self._record_add_list_entry(t.chests, entry, "add_chest")
+        self._record_add_list_entry(x, y, "chests", entry, "add_chest")
         # refresh sidebar list immediately
         self._rebuild_scroll_items()
 
@@ -1545,16 +1940,19 @@ class EditorScreen:
         entry_id = self.link_entry_inp.text.strip()
         if not target_map:
             return
-        t = self.map.tiles[y][x]
+        m = self.map
         new_entry = {"target_map": target_map, "target_entry": entry_id}
         # enforce only 1 link per tile: replace existing if any
-        old_links = list(t.links)
+        old_links = list(m.peek(x, y).links)
         def do():
+            t = m.tile(x, y)
             t.links.clear()
             t.links.append(new_entry)
         def undo():
+            t = m.tile(x, y)
             t.links.clear()
             t.links.extend(old_links)
+            m.prune(x, y)
         self.history.push(do, undo, "set_link")
 
     def set_game_start_here(self):
@@ -1590,18 +1988,19 @@ class EditorScreen:
         # Normalize tile entries to ID-only before saving
         def _norm_tile_lists(o: dict):
             tiles = (o.get('tiles') or [])
-            for row in tiles:
-                for cell in row:
-                    for key in ('npcs','items'):
-                        lst = cell.get(key) or []
-                        for ent in lst:
-                            if isinstance(ent, dict):
-                                if 'id' in ent:
-                                    ent['id'] = norm_id_6(ent.get('id') or '')
-                                # remove legacy fields
-                                ent.pop('name', None)
-                                ent.pop('title', None)
-                                ent.pop('description', None)
+            # only tiles with contents can carry npc/item entries
+            for (x, y) in self.map.contents:
+                cell = tiles[y][x]
+                for key in ('npcs','items'):
+                    lst = cell.get(key) or []
+                    for ent in lst:
+                        if isinstance(ent, dict):
+                            if 'id' in ent:
+                                ent['id'] = norm_id_6(ent.get('id') or '')
+                            # remove legacy fields
+                            ent.pop('name', None)
+                            ent.pop('title', None)
+                            ent.pop('description', None)
         _norm_tile_lists(obj)
         
         write_json(path, obj)
@@ -1618,14 +2017,13 @@ class EditorScreen:
             "height": self.map.height,
         }
 
-        # Replace if it already exists; otherwise append
-        replaced = False
+        # Replace if it already exists; otherwise append. Other entries are
+        # kept as they are, whatever their shape
         for i, m in enumerate(maps):
-            if m.get("file") == file_name:
+            if isinstance(m, dict) and m.get("file") == file_name:
                 maps[i] = entry
-                replaced = True
                 break
-        if not replaced:
+        else:
             maps.append(entry)
 
         write_json(MANIFEST, {"maps": maps})
@@ -1641,23 +2039,27 @@ class EditorScreen:
         if new_w <= 0 or new_h <= 0:
             return
 
-        old_tiles = self.map.tiles
-        old_w = self.map.width
-        old_h = self.map.height
+        m = self.map
+        old_w, old_h = m.width, m.height
+        old_walk, old_enc, old_contents, old_named = m.walk, m.enc, m.contents, m.enc_named
+        # Build the resized grid once so redo restores the same arrays that
+        # later history entries point at
+        new_walk = bytearray(new_w * new_h)
+        new_enc = bytearray(new_w * new_h)
+        cw = min(old_w, new_w)
+        for y in range(min(old_h, new_h)):
+            new_walk[y*new_w:y*new_w + cw] = old_walk[y*old_w:y*old_w + cw]
+            new_enc[y*new_w:y*new_w + cw] = old_enc[y*old_w:y*old_w + cw]
+        new_contents = {k: t for k, t in old_contents.items() if k[0] < new_w and k[1] < new_h}
+        new_named = {k: v for k, v in old_named.items() if k[0] < new_w and k[1] < new_h}
 
         def do():
-            self.map.width = new_w
-            self.map.height = new_h
-            new_tiles = [[TileData() for _ in range(new_w)] for __ in range(new_h)]
-            for y in range(min(old_h, new_h)):
-                for x in range(min(old_w, new_w)):
-                    new_tiles[y][x] = old_tiles[y][x]
-            self.map.tiles = new_tiles
+            m.width, m.height = new_w, new_h
+            m.walk, m.enc, m.contents, m.enc_named = new_walk, new_enc, new_contents, new_named
 
         def undo():
-            self.map.width = old_w
-            self.map.height = old_h
-            self.map.tiles = old_tiles
+            m.width, m.height = old_w, old_h
+            m.walk, m.enc, m.contents, m.enc_named = old_walk, old_enc, old_contents, old_named
 
         self.history.push(do, undo, label="resize_map")
 
@@ -1670,16 +2072,7 @@ class EditorScreen:
         x, y = self.selected
         if not (0 <= x < self.map.width and 0 <= y < self.map.height):
             return
-        t = self.map.tiles[y][x]
-        old = t.encounter
-        new = state
-        if old == new:
-            return
-        def do():
-            t.encounter = new
-        def undo():
-            t.encounter = old
-        self.history.push(do, undo, label="set_encounter")
+        self._record_set_encounter(x, y, state, label="set_encounter")
 
     def _rebuild_scroll_items(self):
         items: List[Tuple[str, Callable[[], None], Optional[Tuple[int,int,int]]]] = []
@@ -1688,28 +2081,28 @@ class EditorScreen:
         x,y = self.selected
         if not (0 <= x < self.map.width and 0 <= y < self.map.height):
             self.scroll_list.set_items([]); return
-        t = self.map.tiles[y][x]
+        t = self.map.peek(x, y)
         # NPCs
         for i, e in enumerate(t.npcs or []):
             if isinstance(e, dict):
                 label = f"{e.get('name','(unnamed)')} [{e.get('id','')}] <{e.get('subcategory','')}>"
             else:
                 label = str(e)
-            items.append((label, lambda i=i: self._record_remove_list_entry(t.npcs, i, 'rem_npc'), None))
+            items.append((label, lambda i=i: self._record_remove_list_entry(x, y, 'npcs', i, 'rem_npc'), None))
         # Items
         for i, e in enumerate(t.items or []):
             if isinstance(e, dict):
                 label = f"{e.get('name','(unnamed)')} [{e.get('id','')}] <{e.get('subcategory','')}>"
             else:
                 label = str(e)
-            items.append((label, lambda i=i: self._record_remove_list_entry(t.items, i, 'rem_item'), None))
+            items.append((label, lambda i=i: self._record_remove_list_entry(x, y, 'items', i, 'rem_item'), None))
         # Chests
         try:
             for i, c in enumerate(getattr(t, 'chests', []) or []):
                 rar = str((c.get('rarity') or 'common')).lower()
                 clabel = f"Chest - {rar.capitalize()}"
                 color = RARITY_COLORS.get(rar, TEXT_MAIN)
-                items.append((clabel, lambda i=i: self._record_remove_list_entry(t.chests, i, 'rem_chest'), color))
+                items.append((clabel, lambda i=i: self._record_remove_list_entry(x, y, 'chests', i, 'rem_chest'), color))
         except Exception:
             pass
         # Link (max 1)
@@ -1718,7 +2111,7 @@ class EditorScreen:
                 label = f"Link -> {e.get('target_map','?')} #{e.get('target_entry','')}"
             else:
                 label = f"Link -> {str(e)}"
-            items.append((label, lambda i=i: self._record_remove_list_entry(t.links, i, 'rem_link'), None))
+            items.append((label, lambda i=i: self._record_remove_list_entry(x, y, 'links', i, 'rem_link'), None))
 
         self.scroll_list.set_items(items)
 
@@ -1810,7 +2203,7 @@ class EditorScreen:
         x,y = self.selected
         if not (0 <= x < self.map.width and 0 <= y < self.map.height):
             return
-        t = self.map.tiles[y][x]
+        t = self.map.peek(x, y)
         text = t.note if t.note else (self.map.description or "")
         self.note_modal_area.text = text
         self.note_modal_open = True
@@ -1826,16 +2219,18 @@ class EditorScreen:
         if not (0 <= x < self.map.width and 0 <= y < self.map.height):
             self.note_modal_open = False
             return
-        t = self.map.tiles[y][x]
+        m = self.map
         new_text = self.note_modal_area.text
-        old_text = t.note
+        old_text = m.peek(x, y).note
         if new_text == old_text:
             self.note_modal_open = False
             return
         def do():
-            t.note = new_text
+            m.tile(x, y).note = new_text
+            m.prune(x, y)
         def undo():
-            t.note = old_text
+            m.tile(x, y).note = old_text
+            m.prune(x, y)
         self.history.push(do, undo, label="set_tile_note")
         self.note_modal_open = False
 
@@ -1855,7 +2250,7 @@ class EditorScreen:
         if not tpos:
             return
         x, y = tpos
-        t = self.map.tiles[y][x]
+        t = self.map.peek(x, y)
         if not t.links:
             return
         link = t.links[0]
@@ -1865,10 +2260,8 @@ class EditorScreen:
         if target_entry:
             lines.append(f"Entry: {target_entry}")
 
-        pad = 8
-        line_h = FONT.get_height()
-        w = max(FONT.size(s)[0] for s in lines) + pad*2
-        h = line_h * len(lines) + pad*2 + (len(lines)-1)*2
+        tip = _tooltip_surface(tuple(lines))
+        w, h = tip.get_size()
 
         mx, my = get_mouse_pos()
         x0 = mx + 16
@@ -1877,15 +2270,6 @@ class EditorScreen:
         if x0 + w > sw: x0 = sw - w - 4
         if y0 + h > sh: y0 = sh - h - 4
 
-        tip = pygame.Surface((w, h), pygame.SRCALPHA)
-        pygame.draw.rect(tip, TOOLTIP_BG_RGBA, tip.get_rect(), border_radius=8)
-        pygame.draw.rect(tip, TOOLTIP_BORDER, tip.get_rect(), 1, border_radius=8)
-
-        yy = pad
-        for s in lines:
-            tip.blit(FONT.render(s, True, TOOLTIP_TEXT), (pad, yy))
-            yy += line_h + 2
-
         surf.blit(tip, (x0, y0))
 
     # ---------- render ----------
@@ -1951,33 +2335,98 @@ class EditorScreen:
         self.offset_x = int(canvas_cx - grid_cx)
         self.offset_y = int(canvas_cy - grid_cy)
 
-    def draw_canvas(self, surf):
-        # Update layout and use current canvas rect
-        self._apply_layout(surf)
-        canvas_rect = self.canvas_rect
-        pygame.draw.rect(surf, CANVAS_BG, canvas_rect)
-        clip = surf.get_clip()
-        surf.set_clip(canvas_rect)
-        # Auto-fit view to mirror main game (optional)
-        if getattr(self, 'auto_fit', False):
-            self._auto_fit_view(surf)
-
-        # Isometric tiles with rotation + 2.5D sides
+    def _blit_grid_background(self, surf, canvas_rect):
+        """Top view tile fills (with encounter tints) and the grid lines
+        between tiles in one blit; draw_canvas adds the outer right/bottom
+        border."""
+        m = self.map
+        W, H = m.width, m.height
+        ts = int(self.tile_size)
+        if W <= 0 or H <= 0 or ts <= 0:
+            return
+        src = self._bg_src
+        if src is None or src[0] is not m.walk or src[1] is not m.enc:
+            # New map arrays (first draw or resize): build every pixel
+            keys = bytes(w * 4 + e for w, e in zip(m.walk, m.enc))
+            buf = bytearray(3 * W * H)
+            for i, table in enumerate(_TOP_CHANNELS):
+                buf[i::3] = keys.translate(table)
+            self._bg_small = pygame.image.frombytes(bytes(buf), (W, H), "RGB")
+            self._bg_src = (m.walk, m.enc)
+            self._bg_scaled = None
+            self._dirty_cells.clear()
+        elif self._dirty_cells:
+            # Paint strokes: recolor just the touched tiles, in both surfaces
+            walk, enc, small = m.walk, m.enc, self._bg_small
+            scaled, key = self._bg_scaled, self._bg_scaled_key
+            for x, y in self._dirty_cells:
+                if x < W and y < H:
+                    col = _TOP_COLORS[walk[y * W + x] * 4 + enc[y * W + x]]
+                    small.set_at((x, y), col)
+                    if scaled is not None and key[0] <= x < key[2] and key[1] <= y < key[3]:
+                        step = key[4]
+                        px, py = (x - key[0]) * step, (y - key[1]) * step
+                        scaled.fill(col, (px, py, step, step))
+                        scaled.fill(GRID_LINE, (px, py, step, 1))
+                        scaled.fill(GRID_LINE, (px, py, 1, step))
+            self._dirty_cells.clear()
+        # Scale only the tiles inside the canvas, so zooming in on a big map
+        # never allocates a surface for the whole grid
+        x0 = max(0, (canvas_rect.left - self.offset_x) // ts)
+        y0 = max(0, (canvas_rect.top - self.offset_y) // ts)
+        x1 = min(W, -(-(canvas_rect.right - self.offset_x) // ts))
+        y1 = min(H, -(-(canvas_rect.bottom - self.offset_y) // ts))
+        if x1 <= x0 or y1 <= y0:
+            return
+        key = (x0, y0, x1, y1, ts)
+        if self._bg_scaled is None or key != self._bg_scaled_key:
+            sub = self._bg_small.subsurface((x0, y0, x1 - x0, y1 - y0))
+            scaled = pygame.transform.scale(sub, ((x1 - x0) * ts, (y1 - y0) * ts))
+            # Grid lines on each tile's left/top edge
+            sw, sh = scaled.get_size()
+            for px in range(0, sw, ts):
+                scaled.fill(GRID_LINE, (px, 0, 1, sh))
+            for py in range(0, sh, ts):
+                scaled.fill(GRID_LINE, (0, py, sw, 1))
+            self._bg_scaled = scaled
+            self._bg_scaled_key = key
+        surf.blit(self._bg_scaled, (int(self.offset_x + x0 * ts), int(self.offset_y + y0 * ts)))
+
+    def _visible_tile_bounds(self, rect: pygame.Rect, margin: int = 0) -> Tuple[int, int, int, int]:
+        """Tile range (x0, y0, x1, y1), end-exclusive, whose centers can fall
+        inside rect grown by margin; maps the rect's corners back through the
+        view basis, so it holds for both Top and iso views."""
+        exx, exy, eyx, eyy = self._basis()
+        det = exx * eyy - eyx * exy
+        if abs(det) < 1e-9:
+            return 0, 0, self.map.width, self.map.height
+        r = rect.inflate(2 * margin, 2 * margin)
+        us, vs = [], []
+        for sx, sy in (r.topleft, r.topright, r.bottomleft, r.bottomright):
+            dx, dy = sx - self.offset_x, sy - self.offset_y
+            us.append((dx * eyy - dy * eyx) / det - 0.5)
+            vs.append((dy * exx - dx * exy) / det - 0.5)
+        x0 = max(0, int(math.floor(min(us))))
+        y0 = max(0, int(math.floor(min(vs))))
+        x1 = min(self.map.width, int(math.ceil(max(us))) + 1)
+        y1 = min(self.map.height, int(math.ceil(max(vs))) + 1)
+        return x0, y0, max(x0, x1), max(y0, y1)
+
+    def _draw_iso_tiles(self, surf, depth, EDGE_DARK, EDGE_LIGHT):
         tile_w, tile_h, half_w, half_h = self._iso_dims()
         exx, exy, eyx, eyy = self._basis()
-        is_iso = bool(getattr(self, 'view_iso', True))
-        depth = 0 if not is_iso else max(4, int((tile_h) * CUBE_DEPTH_PCT))
-        EDGE_DARK  = (16,18,22)
-        EDGE_LIGHT = (92,98,120)
-
+        # Only tiles near the canvas; a rotated top face spans at most
+        # ~1.5 tile widths and the sides hang `depth` below it
+        vx0, vy0, vx1, vy1 = self._visible_tile_bounds(self.canvas_rect, tile_w + depth)
         # Depth-sort tiles by screen-space center Y so farther tiles draw first
         draw_order: List[Tuple[float, int, int]] = []
-        for y in range(self.map.height):
-            for x in range(self.map.width):
+        for y in range(vy0, vy1):
+            for x in range(vx0, vx1):
                 _cx, cy = self._iso_center(x, y)
                 # Use cy (and y as a tie-breaker) for stable sorting
                 draw_order.append((cy, y, x))
         draw_order.sort()
+        walk, enc_codes, map_w = self.map.walk, self.map.enc, self.map.width
 
         for _cy, y, x in draw_order:
             cx, cy = self._iso_center(x, y)
@@ -1987,18 +2436,15 @@ class EditorScreen:
             p2 = (cx + 0.5*exx + 0.5*eyx, cy + 0.5*exy + 0.5*eyy)
             p3 = (cx - 0.5*exx + 0.5*eyx, cy - 0.5*exy + 0.5*eyy)
 
-            # Simpler, clearer top-down style: solid fill in Top view
-            if not is_iso:
-                base_col = LIGHT_WALKABLE if self.map.tiles[y][x].walkable else IMPASSABLE
-            else:
-                base_col = (LIGHT_WALKABLE if (x+y)%2==0 else DARK_WALKABLE) if self.map.tiles[y][x].walkable else IMPASSABLE
+            walkable = walk[y * map_w + x]
+            base_col = (LIGHT_WALKABLE if (x+y)%2==0 else DARK_WALKABLE) if walkable else IMPASSABLE
 
             # sides (extruded downward)
             p0d = (p0[0], p0[1] + depth)
             p1d = (p1[0], p1[1] + depth)
             p2d = (p2[0], p2[1] + depth)
             p3d = (p3[0], p3[1] + depth)
-            if is_iso and depth > 0:
+            if depth > 0:
                 face_r = [(int(p1[0]),int(p1[1])),(int(p2[0]),int(p2[1])),(int(p2d[0]),int(p2d[1])),(int(p1d[0]),int(p1d[1]))]
                 face_f = [(int(p2[0]),int(p2[1])),(int(p3[0]),int(p3[1])),(int(p3d[0]),int(p3d[1])),(int(p2d[0]),int(p2d[1]))]
                 col_r = (int(base_col[0]*0.85), int(base_col[1]*0.85), int(base_col[2]*0.85))
@@ -2008,144 +2454,118 @@ class EditorScreen:
                 pygame.draw.lines(surf, EDGE_DARK, False, face_r + [face_r[0]], 2)
                 pygame.draw.lines(surf, EDGE_DARK, False, face_f + [face_f[0]], 2)
 
-            if not is_iso:
-                # Simple top-down fill: draw a solid square, with optional encounter tint
-                rect = pygame.Rect(int(cx - half_w), int(cy - half_h), int(tile_w), int(tile_w))
-                pygame.draw.rect(surf, base_col, rect)
-                # Apply green/red encounter tint for 'safe'/'danger'
-                enc = getattr(self.map.tiles[y][x], 'encounter', '')
-                if enc:
-                    tint = SAFE_TINT_RGBA if enc == 'safe' else DANGER_TINT_RGBA
-                    overlay = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
-                    overlay.fill(tint)
-                    surf.blit(overlay, rect.topleft)
+            # top surface with texture: rotate square then squash vertically to match tilt
+            # prepare square top (unrotated)
+            square = pygame.Surface((tile_w, tile_w), pygame.SRCALPHA)
+            square.fill(base_col)
+            # textures removed in simplified view; use solid color only
+
+            # encounter tint overlay on top surface (pre-rotation)
+            enc = enc_codes[y * map_w + x]
+            if enc:
+                tint = SAFE_TINT_RGBA if enc == ENC_CODES['safe'] else DANGER_TINT_RGBA
+                tint_surf = pygame.Surface((tile_w, tile_w), pygame.SRCALPHA)
+                tint_surf.fill(tint)
+                square.blit(tint_surf, (0,0))
+
+            # rotate, then vertical squash to match tilt
+            rot_deg = float(ISO_ROT_DEG)
+            rotated = pygame.transform.rotate(square, rot_deg) if abs(rot_deg) > 1e-3 else square
+            if tile_h != tile_w:
+                ratio = max(0.1, float(tile_h) / float(tile_w))
+                out_w, out_h = rotated.get_size()
+                out = pygame.transform.smoothscale(rotated, (out_w, max(1, int(out_h * ratio))))
             else:
-                # top surface with texture: rotate square then squash vertically to match tilt
-                # prepare square top (unrotated)
-                square = pygame.Surface((tile_w, tile_w), pygame.SRCALPHA)
-                square.fill((0,0,0,0))
-                pygame.draw.rect(square, base_col, (0,0,tile_w,tile_w))
-                # textures removed in simplified view; use solid color only
-
-                # encounter tint overlay on top surface (pre-rotation)
-                enc = self.map.tiles[y][x].encounter
-                if enc:
-                    tint = SAFE_TINT_RGBA if enc == 'safe' else DANGER_TINT_RGBA
-                    tint_surf = pygame.Surface((tile_w, tile_w), pygame.SRCALPHA)
-                    tint_surf.fill(tint)
-                    square.blit(tint_surf, (0,0))
-
-                # rotate, then vertical squash to match tilt
-                rot_deg = float(ISO_ROT_DEG if is_iso else 0.0)
-                rotated = pygame.transform.rotate(square, rot_deg) if abs(rot_deg) > 1e-3 else square
-                if is_iso and (tile_h != tile_w):
-                    ratio = max(0.1, float(tile_h) / float(tile_w))
-                    out_w, out_h = rotated.get_size()
-                    out = pygame.transform.smoothscale(rotated, (out_w, max(1, int(out_h * ratio))))
-                else:
-                    out = rotated
-                rect = out.get_rect(center=(int(cx), int(cy)))
-                surf.blit(out, rect)
+                out = rotated
+            rect = out.get_rect(center=(int(cx), int(cy)))
+            surf.blit(out, rect)
 
             # border + selection accent directly on main surface
             top_poly = [(int(p0[0]),int(p0[1])),(int(p1[0]),int(p1[1])),(int(p2[0]),int(p2[1])),(int(p3[0]),int(p3[1]))]
-            if is_iso:
-                # Keep a lighter double-stroke for iso
-                pygame.draw.polygon(surf, EDGE_DARK, top_poly, 2)
-                pygame.draw.polygon(surf, EDGE_LIGHT, top_poly, 1)
-            # In Top view, grid is drawn separately after all tiles
-            if is_iso and self.selected == (x, y):
+            # Keep a lighter double-stroke for iso
+            pygame.draw.polygon(surf, EDGE_DARK, top_poly, 2)
+            pygame.draw.polygon(surf, EDGE_LIGHT, top_poly, 1)
+            if self.selected == (x, y):
                 pygame.draw.polygon(surf, ACCENT, top_poly, 2)
 
-        # Draw grid overlay in Top view for clear full borders
+    def draw_canvas(self, surf):
+        # Update layout and use current canvas rect
+        self._apply_layout(surf)
+        canvas_rect = self.canvas_rect
+        surf.fill(CANVAS_BG, canvas_rect)
+        clip = surf.get_clip()
+        surf.set_clip(canvas_rect)
+        # Auto-fit view to mirror main game (optional)
+        if getattr(self, 'auto_fit', False):
+            self._auto_fit_view(surf)
+
+        # Isometric tiles with rotation + 2.5D sides
+        tile_w, tile_h, half_w, half_h = self._iso_dims()
+        exx, exy, eyx, eyy = self._basis()
+        is_iso = bool(getattr(self, 'view_iso', True))
+        depth = 0 if not is_iso else max(4, int((tile_h) * CUBE_DEPTH_PCT))
+        EDGE_DARK  = (16,18,22)
+        EDGE_LIGHT = (92,98,120)
+
+        if not is_iso:
+            # Top view: all tile fills and encounter tints come from one cached surface
+            self._blit_grid_background(surf, canvas_rect)
+        else:
+            self._draw_iso_tiles(surf, depth, EDGE_DARK, EDGE_LIGHT)
+
+        # Top view grid: inner lines are baked into the background; close
+        # the outer right/bottom border
         if not is_iso and self.map.width > 0 and self.map.height > 0:
             left = self.tile_rect(0, 0).left
             top = self.tile_rect(0, 0).top
             right = self.tile_rect(self.map.width - 1, 0).right
             bottom = self.tile_rect(0, self.map.height - 1).bottom
-            # vertical lines
-            for gx in range(self.map.width + 1):
-                r0 = self.tile_rect(min(gx, self.map.width - 1), 0)
-                xpix = r0.left if gx < self.map.width else r0.right
-                pygame.draw.line(surf, GRID_LINE, (xpix, top), (xpix, bottom), 1)
-            # horizontal lines
-            for gy in range(self.map.height + 1):
-                r0 = self.tile_rect(0, min(gy, self.map.height - 1))
-                ypix = r0.top if gy < self.map.height else r0.bottom
-                pygame.draw.line(surf, GRID_LINE, (left, ypix), (right, ypix), 1)
-
-        # overlays (centered colored dots)
-        for y in range(self.map.height):
-            for x in range(self.map.width):
-                t = self.map.tiles[y][x]
-                r = self.tile_rect(x,y)
-
-                # collect dot categories
-                has = set()
-                for e in t.npcs:
-                    sub = (e.get("subcategory") or "").lower()
-                    if sub == "allies":      has.add("ally")
-                    elif sub == "enemies":   has.add("enemy")
-                    elif sub == "villains":  has.add("villain")
-                    elif sub == "citizens":  has.add("citizen")
-                    elif sub == "monsters":  has.add("monster")
-                    elif sub == "animals":   has.add("animal")
-                if any((isinstance(it, dict) and str(it.get("subcategory","")) .lower()=="quest_items") for it in (t.items or [])):
-                    has.add("quest_item")
-                # Any non-quest item or non-dict entry counts as a generic item
-                if any(((isinstance(it, dict) and str(it.get("subcategory","")) .lower()!="quest_items") or (not isinstance(it, dict))) for it in (t.items or [])):
-                    has.add("item")
-                if t.links:
-                    has.add("link")
-
-                order = ["enemy","villain","ally","citizen","monster","animal","quest_item","item","link"]
-                # Build marker list with shapes so chest can integrate into grid
-                markers: List[Tuple[str, Tuple[int,int,int]]] = []  # (shape, color)
-                for k in order:
-                    if k in has:
-                        markers.append(("circle", TYPE_DOT_COLORS[k]))
-                # Include one square marker if any chest present on tile
-                try:
-                    if len(getattr(t, 'chests', []) or []) > 0:
-                        markers.append(("square", COL_WHITE))
-                except Exception:
-                    pass
+            pygame.draw.line(surf, GRID_LINE, (right, top), (right, bottom), 1)
+            pygame.draw.line(surf, GRID_LINE, (left, bottom), (right, bottom), 1)
+
+        # overlays (centered colored dots): only tiles that hold something
+        # and sit on the canvas. Marker lists are reused until the history
+        # changes (every contents edit goes through it)
+        if self._marker_version != self.history.version:
+            self._marker_version = self.history.version
+            self._marker_cache.clear()
+        cache = self._marker_cache
+        for (x, y), t in self.map.contents.items():
+            r = self.tile_rect(x,y)
+            if not r.colliderect(canvas_rect):
+                continue
 
-                if markers:
-                    # Simple markers in rows inside the tile rect
-                    pad = max(2, self.tile_size // 16)
-                    n = len(markers)
-                    max_cols = 3
-                    cols = min(max_cols, n)
-                    rows = int(math.ceil(n / cols))
-                    avail_w = r.w - 2 * pad
-                    avail_h = r.h - 2 * pad
-                    radius = max(2, int(min(avail_w / (cols * 2.5), avail_h / (rows * 2.5), self.tile_size // 8) * float(DOT_SIZE_SCALE)))
-                    gap_x = max(2, int((avail_w - cols * 2 * radius) / max(1, cols - 1))) if cols > 1 else 0
-                    gap_y = max(2, int((avail_h - rows * 2 * radius) / max(1, rows - 1))) if rows > 1 else 0
-                    start_x = r.x + (r.w - (cols * (2 * radius) + (cols - 1) * gap_x)) // 2 + radius
-                    start_y = r.y + (r.h - (rows * (2 * radius) + (rows - 1) * gap_y)) // 2 + radius
-                    for i, mk in enumerate(markers):
-                        row_i = i // cols
-                        col_i = i % cols
-                        cx_d = start_x + col_i * (2 * radius + gap_x)
-                        cy_d = start_y + row_i * (2 * radius + gap_y)
-                        shape, colr = mk
-                        if shape == "square":
-                            side = max(4, 2 * radius - 2)
-                            rx = int(cx_d - side // 2)
-                            ry = int(cy_d - side // 2)
-                            pygame.draw.rect(surf, colr, (rx, ry, side, side))
-                            pygame.draw.rect(surf, (10,10,12), (rx, ry, side, side), 1)
-                        else:
-                            pygame.draw.circle(surf, colr, (int(cx_d), int(cy_d)), radius)
-                            pygame.draw.circle(surf, (10,10,12), (int(cx_d), int(cy_d)), radius, 1)
+            markers = cache.get((x, y))
+            if markers is None:
+                markers = cache[(x, y)] = tile_markers(t)
+
+            if markers:
+                # Simple markers in rows inside the tile rect
+                pad = max(2, self.tile_size // 16)
+                n = len(markers)
+                max_cols = 3
+                cols = min(max_cols, n)
+                rows = int(math.ceil(n / cols))
+                avail_w = r.w - 2 * pad
+                avail_h = r.h - 2 * pad
+                radius = max(2, int(min(avail_w / (cols * 2.5), avail_h / (rows * 2.5), self.tile_size // 8) * float(DOT_SIZE_SCALE)))
+                gap_x = max(2, int((avail_w - cols * 2 * radius) / max(1, cols - 1))) if cols > 1 else 0
+                gap_y = max(2, int((avail_h - rows * 2 * radius) / max(1, rows - 1))) if rows > 1 else 0
+                start_x = r.x + (r.w - (cols * (2 * radius) + (cols - 1) * gap_x)) // 2 + radius
+                start_y = r.y + (r.h - (rows * (2 * radius) + (rows - 1) * gap_y)) // 2 + radius
+                for i, mk in enumerate(markers):
+                    row_i = i // cols
+                    col_i = i % cols
+                    cx_d = start_x + col_i * (2 * radius + gap_x)
+                    cy_d = start_y + row_i * (2 * radius + gap_y)
+                    shape, colr = mk
+                    surf.blit(_marker_sprite(shape, colr, radius), (int(cx_d) - radius, int(cy_d) - radius))
 
         # Selection highlight on top in Top view (clear and obvious)
         # Highlight Game Start tile (blue outline)
         try:
             wm_path = os.path.join(MAP_DIR, "world_map.json")
-            wm = read_json_any(wm_path, {"start": {"map":"","entry": None, "pos": [0,0]}})
+            wm = read_json_cached(wm_path, {"start": {"map":"","entry": None, "pos": [0,0]}})
             start = wm.get("start", {}) if isinstance(wm, dict) else {}
             smap = start.get("map") or ""
             spos = start.get("pos") or [0,0]
@@ -2172,11 +2592,16 @@ class EditorScreen:
             surf.blit(hl, (r.x, r.y))
             pygame.draw.rect(surf, ACCENT, r, 2)
 
+        # Key hints for walls mode
+        if self.left_click_mode == "paint":
+            hint = "Walls: left-drag walkable, right-drag blocked, F flips the connected region under the cursor"
+            draw_text(surf, hint, (canvas_rect.x + 10, canvas_rect.bottom - FONT_H - 8), TEXT_DIM)
+
         surf.set_clip(clip)
 
     def draw_top_bar(self, surf):
         w, _h = surf.get_size()
-        pygame.draw.rect(surf, PANEL_BG, (0,0,w,50))
+        surf.fill(PANEL_BG, (0,0,w,50))
         draw_text(surf, "Name:", self._label_name_pos, TEXT_DIM)
         draw_text(surf, "Size W x H:", self._label_size_pos, TEXT_DIM)
         self.name_inp.draw(surf)
@@ -2189,7 +2614,7 @@ class EditorScreen:
         # Ensure layout up to date and use anchored sidebar rect
         self._apply_layout(surf)
         sidebar = self.sidebar_rect
-        pygame.draw.rect(surf, PANEL_BG, sidebar); pygame.draw.rect(surf, GRID_LINE, sidebar, 1)
+        surf.fill(PANEL_BG, sidebar); pygame.draw.rect(surf, GRID_LINE, sidebar, 1)
 
         # categories area (adders)
         categories = (
@@ -2204,49 +2629,43 @@ class EditorScreen:
             btn.draw(surf)
         inner_left = self._sidebar_inner_left
         if self.category == "NPCs":
-            pygame.draw.rect(surf, PANEL_BG_DARK, self._section_rect_npc, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, self._section_rect_npc, 1, border_radius=8)
+            draw_panel(surf, self._section_rect_npc, PANEL_BG_DARK, GRID_LINE, 8)
             self.dd_npc_sub.draw_base(surf)
             self.list_box.draw(surf)
             self.btn_add_to_tile.draw(surf)
             draw_text(surf, "NPC Subcategory", self._label_pos_npc, TEXT_DIM, FONT_BOLD)
         elif self.category == "Items":
-            pygame.draw.rect(surf, PANEL_BG_DARK, self._section_rect_items, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, self._section_rect_items, 1, border_radius=8)
+            draw_panel(surf, self._section_rect_items, PANEL_BG_DARK, GRID_LINE, 8)
             self.dd_item_sub.draw_base(surf)
             self.list_box.draw(surf)
             self.btn_add_to_tile.draw(surf)
             draw_text(surf, "Item Subcategory", self._label_pos_items, TEXT_DIM, FONT_BOLD)
         elif self.category == "Chests":
-            pygame.draw.rect(surf, PANEL_BG_DARK, self._section_rect_chests, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, self._section_rect_chests, 1, border_radius=8)
+            draw_panel(surf, self._section_rect_chests, PANEL_BG_DARK, GRID_LINE, 8)
             self.dd_chest_rarity.draw_base(surf)
             self.btn_add_chest.draw(surf)
             draw_text(surf, "Chest Rarity", self._label_pos_chests, TEXT_DIM, FONT_BOLD)
         elif self.category == "Links":
-            pygame.draw.rect(surf, PANEL_BG_DARK, self._section_rect_links, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, self._section_rect_links, 1, border_radius=8)
+            draw_panel(surf, self._section_rect_links, PANEL_BG_DARK, GRID_LINE, 8)
             self.dd_link_map.draw_base(surf)
             self.link_entry_inp.draw(surf)
             self.btn_add_link.draw(surf)
             draw_text(surf, "Target Map", self._label_pos_links, TEXT_DIM, FONT_BOLD)
             draw_text(surf, "Target Entry (optional)", self._label_pos_link_entry, TEXT_DIM)
         else:  # Enemy pool
-            pygame.draw.rect(surf, PANEL_BG_DARK, self._section_rect_enemy, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, self._section_rect_enemy, 1, border_radius=8)
+            draw_panel(surf, self._section_rect_enemy, PANEL_BG_DARK, GRID_LINE, 8)
             draw_text(surf, "Available Enemies", self._label_pos_enemy_catalog, TEXT_DIM, FONT_BOLD)
             self.enemy_catalog_box.draw(surf)
             self.btn_enemy_add.draw(surf)
             draw_text(surf, "Map Enemy Pool", self._label_pos_enemy_pool, TEXT_DIM, FONT_BOLD)
-            self._rebuild_enemy_pool_list()
+            # list is rebuilt by the pool's history entries and on tab switch
             self.enemy_pool_list.draw(surf)
             self.btn_enemy_clear.draw(surf)
 
         # texture selector removed in simplified Top view
 
         # inspector header & scroll list / summaries
-        pygame.draw.rect(surf, PANEL_BG_DARK, self.inspector_header_rect, border_radius=8)
-        pygame.draw.rect(surf, TAB_BORDER, self.inspector_header_rect, 1, border_radius=8)
+        draw_panel(surf, self.inspector_header_rect, PANEL_BG_DARK, TAB_BORDER, 8)
 
         self.btn_tab_tile.selected = (self.inspector_tab == "tile")
         self.btn_tab_tile.draw(surf)
@@ -2256,18 +2675,24 @@ class EditorScreen:
         if self.inspector_tab == "tile":
             if self.selected and (0 <= self.selected[0] < self.map.width) and (0 <= self.selected[1] < self.map.height):
                 x, y = self.selected
-                t = self.map.tiles[y][x]
+                t = self.map.peek(x, y)
+                walkable = self.map.walk[y * self.map.width + x]
+                encounter = self.map.encounter(x, y)
                 note_preview = (t.note[:24] + ".") if (t.note and len(t.note) > 24) else (t.note or "")
-                enc = (" [Safe]" if t.encounter == 'safe' else (" [Danger]" if t.encounter == 'danger' else ""))
+                enc = (" [Safe]" if encounter == 'safe' else (" [Danger]" if encounter == 'danger' else ""))
                 draw_text(
                     surf,
-                    f"({x},{y}) - {'Passable' if t.walkable else 'Impassable'}{enc}"
+                    f"({x},{y}) - {'Passable' if walkable else 'Impassable'}{enc}"
                     f"{(' - ' + note_preview) if note_preview else ''}",
                     (status_x, status_y),
                     TEXT_DIM,
                 )
             self.btn_clear_marker.draw(surf)
-            self._rebuild_scroll_items()
+            # Rows only change with the selection or a history step
+            scroll_key = (self.selected, self.map.width, self.map.height, self.history.version)
+            if scroll_key != self._scroll_key:
+                self._scroll_key = scroll_key
+                self._rebuild_scroll_items()
             if self.scroll_list.rect.h > 0:
                 self.scroll_list.draw(surf)
         else:
@@ -2301,7 +2726,7 @@ class EditorScreen:
 
         # Game start UI (info + button) anchored in sidebar above Tile Info
         wm_path = os.path.join(MAP_DIR, "world_map.json")
-        wm = read_json_any(wm_path, {"start": {"map":"","entry": None, "pos": [0,0]}})
+        wm = read_json_cached(wm_path, {"start": {"map":"","entry": None, "pos": [0,0]}})
         start = wm.get("start", {}) if isinstance(wm, dict) else {}
         smap = start.get("map") or ""
         spos = start.get("pos") or [0,0]
@@ -2315,8 +2740,7 @@ class EditorScreen:
             self.btn_set_start.draw(surf)
         else:
             r = self.btn_set_start.rect
-            pygame.draw.rect(surf, (38,40,52), r, border_radius=6)
-            pygame.draw.rect(surf, GRID_LINE, r, 1, border_radius=6)
+            draw_panel(surf, r, (38,40,52), GRID_LINE, 6)
             draw_text(surf, "Set Game Start Here", (r.x+10, r.y+6), TEXT_DIM)
 
         # description (placed at bottom; no overlaps)
@@ -2351,8 +2775,7 @@ class EditorScreen:
             overlay.fill((0,0,0,160))
             surf.blit(overlay, (0,0))
             panel = pygame.Rect(320, 180, 640, 360)
-            pygame.draw.rect(surf, PANEL_BG, panel, border_radius=8)
-            pygame.draw.rect(surf, GRID_LINE, panel, 1, border_radius=8)
+            draw_panel(surf, panel, PANEL_BG, GRID_LINE, 8)
             draw_text(surf, "Tile Note (saved per tile)", (panel.x+16, panel.y+12), TEXT_MAIN, FONT_BOLD)
             self.note_modal_area.draw(surf)
             self.note_btn_save.draw(surf)
@@ -2369,14 +2792,20 @@ class EditorScreen:
         # Ensure layout is up-to-date for hit testing
         self._apply_layout(self.app.screen)
 
-        # hotkeys
-        if event.type == pygame.KEYDOWN:
+        # hotkeys (not while typing into a field)
+        if event.type == pygame.KEYDOWN and not self._text_focused():
             if (event.key == pygame.K_z) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
                 self.history.undo()
             elif (event.key == pygame.K_y) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
                 self.history.redo()
             elif event.key == pygame.K_s:
                 self.cycle_left_mode()
+            elif event.key == pygame.K_f and self.left_click_mode == "paint" and not self.left_dragging:
+                # Walls mode: flood-flip the region under the cursor
+                t = self._hovered_tile()
+                if t:
+                    self.flood_walkable(*t)
+                    self.selected = t
             elif event.key == pygame.K_ESCAPE:
                 # cancel painting batch if stuck
                 if self.painting_batch_active:
@@ -2557,10 +2986,10 @@ class ListBox:
         if not self.rect.collidepoint((x,y)):
             return None
         y0 = self.rect.y - self.scroll
-        for i, _ in enumerate(self.items):
+        i = _row_at(y, y0, self.item_h + self.spacing, len(self.items))
+        if i >= 0:
             row_y = y0 + i * (self.item_h + self.spacing)
-            row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
-            if row_rect.collidepoint((x,y)):
+            if pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h).collidepoint((x,y)):
                 return i
         return None
     def handle(self, event):
@@ -2568,19 +2997,11 @@ class ListBox:
             if self.rect.collidepoint(get_mouse_pos()):
                 self.scroll = max(0, self.scroll - event.y * 24)
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if not self.rect.collidepoint(event.pos):
-                return
-            x, y = event.pos
-            y0 = self.rect.y - self.scroll
-            for i, _ in enumerate(self.items):
-                row_y = y0 + i * (self.item_h + self.spacing)
-                row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
-                if row_rect.collidepoint((x,y)):
-                    self.selected = i
-                    break
+            i = self.index_at_pos(event.pos)
+            if i is not None:
+                self.selected = i
     def draw(self, surf):
-        pygame.draw.rect(surf, PANEL_BG_DARK, self.rect, border_radius=8)
-        pygame.draw.rect(surf, GRID_LINE, self.rect, 1, border_radius=8)
+        draw_panel(surf, self.rect, PANEL_BG_DARK, GRID_LINE, 8)
         clip = surf.get_clip()
         surf.set_clip(self.rect)
         y0 = self.rect.y - self.scroll
@@ -2593,7 +3014,7 @@ class ListBox:
             row_rect = pygame.Rect(self.rect.x+6, row_y, self.rect.w-12, self.item_h)
             hovered = row_rect.collidepoint((mx, my))
             base = BTN_HOVER if (hovered or i == self.selected) else PANEL_BG
-            pygame.draw.rect(surf, base, row_rect, border_radius=6)
+            draw_panel(surf, row_rect, base, None, 6)
             draw_text(surf, label[:60], (row_rect.x+8, row_rect.y+4))
         surf.set_clip(clip)
 
@@ -2700,8 +3121,7 @@ class WorldScreen:
             ry = self.margin + y*self.cell
             rect = pygame.Rect(rx, ry, self.cell-8, self.cell-8)
             col = ACCENT if i == self.selected_idx else BTN_BG
-            pygame.draw.rect(surf, col, rect, border_radius=12)
-            pygame.draw.rect(surf, GRID_LINE, rect, 1, border_radius=12)
+            draw_panel(surf, rect, col, GRID_LINE, 12)
             draw_text(surf, name, (rect.x+8, rect.y+8))
 
 # -------------------- App --------------------
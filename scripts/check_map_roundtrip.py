@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+scripts/check_map_roundtrip.py
+Loads every map under data/maps/ through the map editor's MapData and saves it
+back to a dict, then reports any tile field that did not survive the round
+trip (walkable, encounter, links, chests, note, texture, and npc/item refs
+after the editor's ID-only normalisation).
+
+Exit code 1 when any map differs.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MAPS_DIR = ROOT / "data" / "maps"
+
+# map_editor initialises pygame on import; no window is needed here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, str(ROOT))
+import map_editor  # noqa: E402
+
+PLAIN_KEYS = ("walkable", "encounter", "links", "chests", "note", "texture")
+
+def expected_cell(cell: dict) -> dict:
+    out = {
+        "walkable": bool(cell.get("walkable", False)),
+        "encounter": str(cell.get("encounter", "")),
+        "links": list(cell.get("links", [])),
+        "chests": list(cell.get("chests", [])),
+        "note": str(cell.get("note", "")),
+        "texture": str(cell.get("texture", "")),
+    }
+    for key in ("npcs", "items"):
+        out[key] = [map_editor._tile_ref(e) for e in cell.get(key, []) if isinstance(e, dict)]
+    return out
+
+def check_map(path: Path) -> list[str]:
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    tiles = doc.get("tiles") if isinstance(doc, dict) else None
+    if not (isinstance(tiles, list) and tiles and isinstance(tiles[0], list)):
+        return []  # manifest, world map or other non-grid document
+    saved = map_editor.MapData.from_dict(doc).to_dict()
+    errors: list[str] = []
+    for key in ("width", "height"):
+        if saved[key] != doc.get(key):
+            errors.append(f"{path.name}: {key} {doc.get(key)!r} -> {saved[key]!r}")
+    for y, row in enumerate(tiles):
+        for x, cell in enumerate(row):
+            want = expected_cell(cell or {})
+            got = saved["tiles"][y][x]
+            for key in PLAIN_KEYS + ("npcs", "items"):
+                if got[key] != want[key]:
+                    errors.append(f"{path.name} ({x},{y}) {key}: {want[key]!r} -> {got[key]!r}")
+    # saving what was loaded must be stable
+    again = map_editor.MapData.from_dict(json.loads(json.dumps(saved))).to_dict()
+    if json.dumps(again, sort_keys=True) != json.dumps(saved, sort_keys=True):
+        errors.append(f"{path.name}: second round trip differs from the first")
+    return errors
+
+def main() -> int:
+    errors: list[str] = []
+    for path in sorted(MAPS_DIR.glob("*.json")):
+        errors.extend(check_map(path))
+    for e in errors:
+        print("[ERR]", e)
+    print(f"Checked {len(list(MAPS_DIR.glob('*.json')))} files under data/maps: "
+          f"{'OK' if not errors else str(len(errors)) + ' difference(s)'}")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())